@@ -0,0 +1,368 @@
+from backend.models import BoatType, SkillLevel
+from backend.scoring.batch import ALL_PROFILES, Profile
+from backend.services.snapshot import to_minutes
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+from datetime import datetime
+import json
+import os
+import uuid
+
+try:
+    import fcntl
+except ImportError:
+    # Sin flock (Windows) no hay coordinación entre procesos: un solo worker
+    fcntl = None
+
+
+KINDS = ("score_above", "no_go_clears")
+
+_OPEN_START = -(2 ** 62)
+_OPEN_END = 2 ** 62
+
+_PROFILE_INDEX = {profile: i for i, profile in enumerate(ALL_PROFILES)}
+
+
+def cell_key(lat: float, lon: float) -> str:
+    """Celda de la regla: misma resolución que el cache de forecast"""
+    return f"{lat:.2f}_{lon:.2f}"
+
+
+class _RangeMax:
+    """Tabla dispersa: índice del máximo de scores[lo..hi] en O(1) tras O(n log n)"""
+
+    def __init__(self, scores: Sequence[int]):
+        self.scores = scores
+        self.table = [list(range(len(scores)))]
+        width = 1
+        while width * 2 <= len(scores):
+            prev = self.table[-1]
+            row = []
+            for i in range(len(scores) - width * 2 + 1):
+                a, b = prev[i], prev[i + width]
+                row.append(a if scores[a] >= scores[b] else b)
+            self.table.append(row)
+            width *= 2
+
+    def argmax(self, lo: int, hi: int) -> int:
+        level = (hi - lo + 1).bit_length() - 1
+        a, b = self.table[level][lo], self.table[level][hi - (1 << level) + 1]
+        return a if self.scores[a] >= self.scores[b] else b
+
+
+class AlertEngine:
+    """
+    Almacén compacto de reglas de alerta indexadas por celda y perfil.
+    Cada regla ocupa una posición en arrays paralelos; al refrescar una celda solo se
+    evalúan sus reglas, con consultas O(1) sobre la serie puntuada de cada perfil.
+
+    Con `path`, el log de altas, bajas y estados es el almacén compartido entre workers:
+    cada proceso aplica con sync() lo que los demás han añadido, y solo el que tiene el
+    bloqueo de evaluador (is_evaluator) evalúa y notifica.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._reset()
+        # Posición ya aplicada del log, su inode (cambia al compactar) y líneas que contiene
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self._lines = 0
+        # Fichero abierto con el bloqueo de evaluador mientras este proceso lo tenga
+        self._owner = None
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def _reset(self) -> None:
+        self._ids: List[Optional[str]] = []
+        self._kind = array("b")
+        self._threshold = array("h")
+        self._start = array("q")
+        self._end = array("q")
+        self._profile = array("B")
+        self._lat = array("d")
+        self._lon = array("d")
+        # Estado de la última evaluación: condición cumplida (score_above) o había NO-GO (no_go_clears)
+        self._last = bytearray()
+        self._contact: List[Optional[str]] = []
+        self._raw_start: List[Optional[str]] = []
+        self._raw_end: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        # celda -> índice de perfil -> posiciones
+        self._index: Dict[str, Dict[int, List[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add_rule(
+        self,
+        lat: float,
+        lon: float,
+        boat_type: BoatType,
+        skill: SkillLevel,
+        kind: str,
+        threshold: int = 75,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        contact: Optional[str] = None,
+        rule_id: Optional[str] = None,
+        persist: bool = True
+    ) -> str:
+        if kind not in KINDS:
+            raise ValueError(f"Tipo de alerta desconocido: {kind}")
+        rule_id = rule_id or uuid.uuid4().hex[:12]
+        values = (
+            KINDS.index(kind), threshold,
+            to_minutes(start) if start else _OPEN_START,
+            to_minutes(end) if end else _OPEN_END,
+            _PROFILE_INDEX[(BoatType(boat_type), SkillLevel(skill))],
+            lat, lon
+        )
+
+        if self._free:
+            slot = self._free.pop()
+            for column, value in zip(self._columns(), values):
+                column[slot] = value
+            self._last[slot] = 0
+            self._ids[slot] = rule_id
+            self._contact[slot] = contact
+            self._raw_start[slot] = start
+            self._raw_end[slot] = end
+        else:
+            slot = len(self._ids)
+            for column, value in zip(self._columns(), values):
+                column.append(value)
+            self._last.append(0)
+            self._ids.append(rule_id)
+            self._contact.append(contact)
+            self._raw_start.append(start)
+            self._raw_end.append(end)
+
+        self._slots[rule_id] = slot
+        self._index.setdefault(cell_key(lat, lon), {}).setdefault(self._profile[slot], []).append(slot)
+        if persist:
+            self._append(self.get_rule(rule_id))
+        return rule_id
+
+    def remove_rule(self, rule_id: str, persist: bool = True) -> bool:
+        slot = self._slots.pop(rule_id, None)
+        if slot is None:
+            return False
+        cell = cell_key(self._lat[slot], self._lon[slot])
+        profiles = self._index[cell]
+        profiles[self._profile[slot]].remove(slot)
+        if not profiles[self._profile[slot]]:
+            del profiles[self._profile[slot]]
+        if not profiles:
+            del self._index[cell]
+        self._ids[slot] = None
+        self._contact[slot] = None
+        self._free.append(slot)
+        if persist:
+            self._append({"id": rule_id, "deleted": True})
+        return True
+
+    def get_rule(self, rule_id: str) -> Optional[Dict]:
+        slot = self._slots.get(rule_id)
+        if slot is None:
+            return None
+        boat_type, skill = ALL_PROFILES[self._profile[slot]]
+        return {
+            "id": rule_id,
+            "lat": round(self._lat[slot], 4),
+            "lon": round(self._lon[slot], 4),
+            "boat_type": boat_type.value,
+            "skill": skill.value,
+            "kind": KINDS[self._kind[slot]],
+            "threshold": self._threshold[slot],
+            "start": self._raw_start[slot],
+            "end": self._raw_end[slot],
+            "contact": self._contact[slot]
+        }
+
+    def cells(self) -> Dict[str, tuple]:
+        """Celdas con reglas activas y unas coordenadas representativas de cada una"""
+        coords = {}
+        for cell, profiles in self._index.items():
+            slot = next(iter(profiles.values()))[0]
+            coords[cell] = (float(self._lat[slot]), float(self._lon[slot]))
+        return coords
+
+    def profiles_for_cell(self, lat: float, lon: float) -> List[Profile]:
+        return [ALL_PROFILES[i] for i in self._index.get(cell_key(lat, lon), {})]
+
+    def evaluate(
+        self,
+        lat: float,
+        lon: float,
+        times: Sequence[str],
+        series: Dict[Profile, tuple]
+    ) -> List[Dict]:
+        """
+        Evalúa las reglas de la celda contra la serie puntuada de cada perfil.
+        `series` es perfil -> (scores, no_go) con una entrada por ventana de `times`.
+        Devuelve las notificaciones de las reglas que pasan a cumplirse.
+        Las reglas cuyo final queda fuera de la serie no se evalúan ni cambian de estado:
+        con una serie parcial no se sabe si se cumplen.
+        """
+        profiles = self._index.get(cell_key(lat, lon))
+        if not profiles or not times:
+            return []
+
+        minutes = [to_minutes(t) for t in times]
+        covered_until = minutes[-1] + (minutes[-1] - minutes[-2] if len(minutes) > 1 else 0)
+        fired_at = datetime.now().isoformat(timespec="seconds")
+        notifications = []
+        previous = {slot: self._last[slot] for slots in profiles.values() for slot in slots}
+
+        for profile_index, slots in profiles.items():
+            profile = ALL_PROFILES[profile_index]
+            if profile not in series:
+                continue
+            scores, no_go = series[profile]
+            range_max = _RangeMax(scores)
+            no_go_prefix = [0]
+            for flag in no_go:
+                no_go_prefix.append(no_go_prefix[-1] + (1 if flag else 0))
+
+            for slot in slots:
+                if self._end[slot] != _OPEN_END and self._end[slot] > covered_until:
+                    continue
+                lo = bisect_left(minutes, self._start[slot])
+                hi = bisect_right(minutes, self._end[slot])
+                if lo >= hi:
+                    continue
+
+                if self._kind[slot] == 0:
+                    best = range_max.argmax(lo, hi - 1)
+                    hit = scores[best] > self._threshold[slot]
+                    if hit and not self._last[slot]:
+                        notifications.append(self._notification(slot, times[best], scores[best], fired_at))
+                    self._last[slot] = 1 if hit else 0
+                else:
+                    has_no_go = no_go_prefix[hi] - no_go_prefix[lo] > 0
+                    if self._last[slot] and not has_no_go:
+                        best = range_max.argmax(lo, hi - 1)
+                        notifications.append(self._notification(slot, times[best], scores[best], fired_at))
+                    self._last[slot] = 1 if has_no_go else 0
+
+        # El estado se guarda para no repetir avisos tras un reinicio o si otro proceso pasa a evaluar
+        self._append(*(
+            {"id": self._ids[slot], "state": self._last[slot]}
+            for slot, last in previous.items() if self._last[slot] != last
+        ))
+        self._compact_if_needed()
+        return notifications
+
+    def _notification(self, slot: int, time: str, score: int, fired_at: str) -> Dict:
+        rule = self.get_rule(self._ids[slot])
+        return {"rule": rule, "time": time, "score": score, "fired_at": fired_at}
+
+    def _columns(self):
+        return (self._kind, self._threshold, self._start, self._end, self._profile, self._lat, self._lon)
+
+    def is_evaluator(self) -> bool:
+        """
+        True si este proceso debe evaluar y notificar. Con log en disco solo lo hace el que tiene
+        el bloqueo `<path>.owner`; si ese proceso termina, lo hereda el siguiente que lo pida.
+        """
+        if self._owner is not None or not self.path or fcntl is None:
+            return True
+        owner = open(f"{self.path}.owner", "a")
+        try:
+            fcntl.flock(owner, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            owner.close()
+            return False
+        self._owner = owner
+        return True
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """Serializa las escrituras y compactaciones del log entre procesos"""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _append(self, *records: Dict) -> None:
+        """Añade altas, bajas o estados al log: O(1) por cambio en lugar de reescribirlo"""
+        if not self.path or not records:
+            return
+        with self._write_lock():
+            with open(self.path, "a") as f:
+                f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+
+    def _apply(self, record: Dict) -> None:
+        """Aplica una línea del log; volver a aplicar las propias es inocuo"""
+        rule_id = record.pop("id")
+        if record.get("deleted"):
+            self.remove_rule(rule_id, persist=False)
+        elif "state" in record:
+            slot = self._slots.get(rule_id)
+            if slot is not None:
+                self._last[slot] = record["state"]
+        elif rule_id not in self._slots:
+            self.add_rule(rule_id=rule_id, persist=False, **record)
+
+    def _read(self) -> None:
+        """Aplica las líneas completas del log desde la última posición leída"""
+        with open(self.path, "rb") as f:
+            self._inode = os.fstat(f.fileno()).st_ino
+            f.seek(self._offset)
+            for line in f:
+                # Una línea sin salto es una escritura a medias de otro proceso: se lee en el próximo sync
+                if not line.endswith(b"\n"):
+                    break
+                self._offset += len(line)
+                if line.strip():
+                    self._lines += 1
+                    self._apply(json.loads(line))
+
+    def sync(self) -> None:
+        """Aplica lo que otros procesos han añadido al log; si lo han compactado, lo relee entero"""
+        if not self.path:
+            return
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._reset()
+            self._offset = self._lines = 0
+        if stat.st_size > self._offset:
+            self._read()
+
+    def save(self) -> None:
+        """Reescribe el log solo con las reglas activas y su estado (compactación)"""
+        if not self.path:
+            return
+        with self._write_lock():
+            # Bajo el bloqueo nadie escribe: se aplica lo último de otros procesos antes de reescribir
+            self.sync()
+            records = []
+            for rule_id, slot in self._slots.items():
+                records.append(self.get_rule(rule_id))
+                if self._last[slot]:
+                    records.append({"id": rule_id, "state": 1})
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+            os.replace(tmp_path, self.path)
+            stat = os.stat(self.path)
+            self._inode, self._offset, self._lines = stat.st_ino, stat.st_size, len(records)
+
+    def _compact_if_needed(self) -> None:
+        if self.path and self._lines > 2 * len(self) + 100:
+            self.save()
+
+    def load(self, path: str) -> None:
+        """Reproduce el log de altas, bajas y estados; si acumula muchas líneas sobrantes, lo compacta"""
+        self.path = path
+        self.sync()
+        self._compact_if_needed()
@@ -0,0 +1,58 @@
+from backend.utils.serialization import dumps
+from typing import Dict, List
+from abc import ABC, abstractmethod
+import asyncio
+import os
+
+
+class AlertSink(ABC):
+    """Destino de las notificaciones de alertas"""
+
+    @abstractmethod
+    async def send(self, notifications: List[Dict]) -> None:
+        ...
+
+
+class OutboxSink(AlertSink):
+    """Añade cada notificación como una línea JSON a un fichero local"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, notifications: List[Dict]) -> None:
+        with open(self.path, "ab") as f:
+            for notification in notifications:
+                f.write(dumps(notification) + b"\n")
+
+    async def send(self, notifications: List[Dict]) -> None:
+        if notifications:
+            await asyncio.to_thread(self._write, notifications)
+
+
+class WebhookSink(AlertSink):
+    """Envía las notificaciones de una evaluación en un único POST JSON"""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def send(self, notifications: List[Dict]) -> None:
+        if not notifications:
+            return
+        import httpx
+
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.post(
+                self.url,
+                content=dumps({"notifications": notifications}),
+                headers={"Content-Type": "application/json"}
+            )
+            response.raise_for_status()
+
+
+def sink_from_env() -> AlertSink:
+    """ALERT_WEBHOOK_URL si está definida; si no, el fichero ALERT_OUTBOX_PATH"""
+    url = os.environ.get("ALERT_WEBHOOK_URL")
+    if url:
+        return WebhookSink(url)
+    return OutboxSink(os.environ.get("ALERT_OUTBOX_PATH", "alerts_outbox.jsonl"))
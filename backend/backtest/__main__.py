@@ -0,0 +1,52 @@
+"""
+Backtest offline del scoring sobre datos horarios archivados.
+
+Ejemplo:
+    python -m backend.backtest \
+        --source "Barcelona=data/bcn_weather.json,data/bcn_marine.json" \
+        --source "Palma=data/palma.csv" \
+        --profile velero_medio:intermedio --output resultados.csv
+"""
+from backend.models import BoatType, SkillLevel
+from backend.backtest.engine import ALL_PROFILES, LocationSource, run_backtest, write_results
+from backend.backtest.sources import DEFAULT_CHUNK_HOURS
+import argparse
+
+
+def parse_source(value: str) -> LocationSource:
+    name, _, paths = value.partition("=")
+    if not paths:
+        raise argparse.ArgumentTypeError("Formato esperado: NOMBRE=RUTA[,RUTA_MARINA]")
+    path, _, marine_path = paths.partition(",")
+    if marine_path and not path.endswith(".json"):
+        # CSV y Parquet llevan las columnas marinas en el mismo fichero
+        raise argparse.ArgumentTypeError(f"La ruta marina aparte solo se admite con JSON de Open-Meteo: {value}")
+    return LocationSource(name, path, marine_path or None)
+
+
+def parse_profile(value: str):
+    boat_type, _, skill = value.partition(":")
+    try:
+        return BoatType(boat_type), SkillLevel(skill)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Perfil no válido: {value} (barco:nivel)")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backend.backtest", description="Backtest de Sailing Day Score")
+    parser.add_argument("--source", type=parse_source, action="append", required=True,
+                        help="NOMBRE=RUTA[,RUTA_MARINA] (.json de Open-Meteo archive; .csv o .parquet con las columnas marinas incluidas)")
+    parser.add_argument("--profile", type=parse_profile, action="append",
+                        help="barco:nivel (por defecto todos los perfiles)")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos (por defecto todos los núcleos)")
+    parser.add_argument("--chunk-days", type=int, default=DEFAULT_CHUNK_HOURS // 24, help="Días por bloque")
+    parser.add_argument("--output", default="backtest.csv", help="Fichero de salida .csv o .json")
+    args = parser.parse_args()
+
+    rows = run_backtest(args.source, args.profile or ALL_PROFILES, args.workers, args.chunk_days * 24)
+    write_results(rows, args.output)
+    print(f"{len(rows)} filas escritas en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
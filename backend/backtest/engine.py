@@ -0,0 +1,173 @@
+from backend.scoring.batch import ALL_PROFILES, Profile, extract_columns, metrics_at, score_profiles
+from backend.scoring.combined import check_no_go
+from backend.scoring.daily import SAILABLE_MIN_SCORE, WINDOW_HOURS
+from backend.backtest.sources import DEFAULT_CHUNK_HOURS, read_source
+from backend.services.snapshot import Snapshot
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import csv
+import json
+import multiprocessing
+import os
+
+
+# Un día cuenta como navegable si suma al menos estas horas navegables
+SAILABLE_DAY_MIN_HOURS = 6
+
+# (año, barco, nivel) -> [ventanas, suma de scores, mejor score, ventanas navegables, ventanas no-go]
+YearStats = Dict[Tuple[str, str, str], List[float]]
+# (día, barco, nivel) -> ventanas navegables
+DayCounts = Dict[Tuple[str, str, str], int]
+
+
+class LocationSource:
+    """Serie horaria archivada de una ubicación (fichero meteorológico y, opcionalmente, marino)"""
+
+    def __init__(self, name: str, path: str, marine_path: Optional[str] = None):
+        self.name = name
+        self.path = path
+        self.marine_path = marine_path
+
+
+def pack_chunk(chunk: Dict[str, List]) -> Union[bytes, Dict[str, List]]:
+    """Snapshot binario del bloque para enviarlo al worker; los bloques con huecos van tal cual"""
+    try:
+        return Snapshot.from_hourly(chunk).to_bytes()
+    except ValueError:
+        return chunk
+
+
+def score_chunk(chunk: Union[bytes, Dict[str, List]], profiles: Sequence[Profile]) -> Tuple[YearStats, DayCounts]:
+    """
+    Puntúa un bloque horario para todos los perfiles y devuelve agregados parciales.
+    Se ejecuta en los workers: solo recibe y devuelve estructuras pequeñas.
+    """
+    if isinstance(chunk, bytes):
+        chunk = Snapshot.from_bytes(chunk).hourly()
+    has_marine = any(value is not None for value in chunk.get("wave_height", []))
+    columns = extract_columns(chunk, chunk if has_marine else None, skip_incomplete=True)
+    results = score_profiles(columns, profiles)
+
+    year_stats: YearStats = {}
+    day_counts: DayCounts = {}
+    metrics = [metrics_at(columns, i) for i in range(len(columns["time"]))]
+
+    for (boat_type, skill), profile_results in zip(profiles, results):
+        for i, (score, _, _, _) in enumerate(profile_results):
+            time = columns["time"][i]
+            year_key = (time[:4], boat_type.value, skill.value)
+            day_key = (time[:10], boat_type.value, skill.value)
+
+            stats = year_stats.get(year_key)
+            if stats is None:
+                stats = year_stats[year_key] = [0, 0, 0, 0, 0]
+            stats[0] += 1
+            stats[1] += score
+            stats[2] = max(stats[2], score)
+
+            if check_no_go(metrics[i], skill)[0]:
+                stats[4] += 1
+                day_counts.setdefault(day_key, 0)
+            elif score >= SAILABLE_MIN_SCORE:
+                stats[3] += 1
+                day_counts[day_key] = day_counts.get(day_key, 0) + 1
+            else:
+                day_counts.setdefault(day_key, 0)
+
+    return year_stats, day_counts
+
+
+def merge(totals: Tuple[YearStats, DayCounts], partial: Tuple[YearStats, DayCounts]) -> None:
+    year_totals, day_totals = totals
+    year_stats, day_counts = partial
+    for key, stats in year_stats.items():
+        current = year_totals.get(key)
+        if current is None:
+            year_totals[key] = list(stats)
+        else:
+            current[0] += stats[0]
+            current[1] += stats[1]
+            current[2] = max(current[2], stats[2])
+            current[3] += stats[3]
+            current[4] += stats[4]
+    # Un día puede quedar repartido entre dos bloques: se suman sus ventanas
+    for key, count in day_counts.items():
+        day_totals[key] = day_totals.get(key, 0) + count
+
+
+def summarize(name: str, totals: Tuple[YearStats, DayCounts]) -> List[Dict]:
+    """Convierte los agregados en filas por ubicación, año y perfil"""
+    year_totals, day_totals = totals
+    days: Dict[Tuple[str, str, str], List[int]] = {}
+    for (day, boat_type, skill), count in day_totals.items():
+        entry = days.setdefault((day[:4], boat_type, skill), [0, 0])
+        entry[0] += 1
+        if count * WINDOW_HOURS >= SAILABLE_DAY_MIN_HOURS:
+            entry[1] += 1
+
+    rows = []
+    for (year, boat_type, skill), (windows, score_sum, best, sailable, no_go) in sorted(year_totals.items()):
+        total_days, sailable_days = days.get((year, boat_type, skill), [0, 0])
+        rows.append({
+            "location": name,
+            "year": int(year),
+            "boat_type": boat_type,
+            "skill": skill,
+            "windows": int(windows),
+            "mean_score": round(score_sum / windows, 1) if windows else 0.0,
+            "best_score": int(best),
+            "sailable_hours": int(sailable) * WINDOW_HOURS,
+            "no_go_hours": int(no_go) * WINDOW_HOURS,
+            "days": total_days,
+            "sailable_days": sailable_days
+        })
+    return rows
+
+
+def run_backtest(
+    sources: Iterable[LocationSource],
+    profiles: Sequence[Profile] = ALL_PROFILES,
+    workers: Optional[int] = None,
+    chunk_hours: int = DEFAULT_CHUNK_HOURS
+) -> List[Dict]:
+    """
+    Ejecuta el backtest: lee cada fuente en bloques y los reparte entre los workers.
+    Como mucho hay 2 bloques por worker en vuelo, así que la memoria no depende del tamaño del archivo.
+    """
+    workers = workers or os.cpu_count() or 1
+    profiles = list(profiles)
+    rows: List[Dict] = []
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for source in sources:
+            totals: Tuple[YearStats, DayCounts] = ({}, {})
+            pending = set()
+            for chunk in read_source(source.path, source.marine_path, chunk_hours):
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        merge(totals, future.result())
+                pending.add(pool.submit(score_chunk, pack_chunk(chunk), profiles))
+            for future in pending:
+                merge(totals, future.result())
+            rows.extend(summarize(source.name, totals))
+
+    return rows
+
+
+OUTPUT_FIELDS = (
+    "location", "year", "boat_type", "skill", "windows", "mean_score", "best_score",
+    "sailable_hours", "no_go_hours", "days", "sailable_days"
+)
+
+
+def write_results(rows: List[Dict], path: str) -> None:
+    """Escribe las estadísticas en CSV o JSON según la extensión"""
+    if path.endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
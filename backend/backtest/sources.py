@@ -0,0 +1,139 @@
+from backend.services.openmeteo import WEATHER_VARIABLES
+from backend.services.marine import MARINE_VARIABLES
+from typing import Dict, Iterator, List, Optional
+import csv
+import json
+
+
+# Nombres actuales de Open-Meteo (archive/export) -> nombres que usa el scoring
+ALIASES = {
+    "wind_speed_10m": "windspeed_10m",
+    "wind_gusts_10m": "windgusts_10m",
+    "wind_direction_10m": "winddirection_10m"
+}
+
+COLUMNS = ("time",) + WEATHER_VARIABLES + MARINE_VARIABLES
+
+# Bloques de días completos para que el muestreo de 3h quede alineado entre bloques
+DEFAULT_CHUNK_HOURS = 24 * 30
+
+
+def normalize_name(name: str) -> str:
+    """Quita la unidad de las cabeceras exportadas ('wind_speed_10m (km/h)') y aplica alias"""
+    name = name.split(" (", 1)[0].strip()
+    return ALIASES.get(name, name)
+
+
+def _to_value(raw: str) -> Optional[float]:
+    if raw is None or raw == "" or raw.lower() == "nan":
+        return None
+    return float(raw)
+
+
+def _empty_chunk() -> Dict[str, List]:
+    return {name: [] for name in COLUMNS}
+
+
+def read_openmeteo_json(
+    weather_path: str,
+    marine_path: Optional[str] = None,
+    chunk_hours: int = DEFAULT_CHUNK_HOURS
+) -> Iterator[Dict[str, List]]:
+    """
+    Lee respuestas JSON de la API archive de Open-Meteo (y opcionalmente de la marina)
+    y las entrega en bloques de `chunk_hours` horas con las columnas del scoring.
+    El JSON de Open-Meteo va por columnas, así que cada fichero se carga entero en memoria;
+    para series largas conviene exportar a CSV o Parquet, que se leen por bloques.
+    """
+    with open(weather_path) as f:
+        weather = json.load(f).get("hourly", {})
+    hourly = {normalize_name(name): values for name, values in weather.items()}
+    del weather
+    times = hourly.get("time", [])
+
+    marine: Dict = {}
+    index: Dict[str, int] = {}
+    if marine_path:
+        with open(marine_path) as f:
+            marine = json.load(f).get("hourly", {})
+        # La serie marina se alinea con la meteorológica por instante, bloque a bloque
+        index = {t: i for i, t in enumerate(marine.get("time", []))}
+
+    for lo in range(0, len(times), chunk_hours):
+        chunk_times = times[lo:lo + chunk_hours]
+        chunk = {"time": chunk_times}
+        for name in COLUMNS[1:]:
+            chunk[name] = hourly[name][lo:lo + chunk_hours] if name in hourly else [None] * len(chunk_times)
+        if marine_path:
+            positions = [index.get(t) for t in chunk_times]
+            for name in MARINE_VARIABLES:
+                values = marine.get(name, [])
+                chunk[name] = [values[i] if i is not None and i < len(values) else None for i in positions]
+        yield chunk
+
+
+def read_csv(path: str, chunk_hours: int = DEFAULT_CHUNK_HOURS) -> Iterator[Dict[str, List]]:
+    """
+    Lee un CSV horario en streaming (formato de exportación de Open-Meteo o cabecera simple).
+    Las líneas de metadatos anteriores a la cabecera `time,...` se ignoran.
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = None
+        for row in reader:
+            if row and row[0].strip() == "time":
+                header = [normalize_name(name) for name in row]
+                break
+        if header is None:
+            return
+
+        positions = {name: header.index(name) for name in COLUMNS if name in header}
+        chunk = _empty_chunk()
+        for row in reader:
+            if not row:
+                continue
+            for name in COLUMNS:
+                i = positions.get(name)
+                if name == "time":
+                    chunk["time"].append(row[i])
+                else:
+                    chunk[name].append(_to_value(row[i]) if i is not None and i < len(row) else None)
+            if len(chunk["time"]) >= chunk_hours:
+                yield chunk
+                chunk = _empty_chunk()
+        if chunk["time"]:
+            yield chunk
+
+
+def read_parquet(path: str, chunk_hours: int = DEFAULT_CHUNK_HOURS) -> Iterator[Dict[str, List]]:
+    """Lee un Parquet horario por lotes (requiere pyarrow)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Leer Parquet requiere pyarrow (pip install pyarrow)")
+
+    parquet = pq.ParquetFile(path)
+    available = {normalize_name(name): name for name in parquet.schema_arrow.names}
+    wanted = [available[name] for name in COLUMNS if name in available]
+
+    for batch in parquet.iter_batches(batch_size=chunk_hours, columns=wanted):
+        data = {normalize_name(name): batch.column(name).to_pylist() for name in batch.schema.names}
+        times = [t if isinstance(t, str) else t.strftime("%Y-%m-%dT%H:%M") for t in data["time"]]
+        yield {name: times if name == "time" else data.get(name, [None] * len(times)) for name in COLUMNS}
+
+
+def read_source(
+    path: str,
+    marine_path: Optional[str] = None,
+    chunk_hours: int = DEFAULT_CHUNK_HOURS
+) -> Iterator[Dict[str, List]]:
+    """Elige el lector según la extensión del fichero"""
+    if path.endswith(".json"):
+        return read_openmeteo_json(path, marine_path, chunk_hours)
+    if marine_path:
+        raise ValueError(f"La ruta marina aparte solo se admite con JSON de Open-Meteo: {path}")
+    if path.endswith(".csv"):
+        return read_csv(path, chunk_hours)
+    if path.endswith(".parquet"):
+        return read_parquet(path, chunk_hours)
+    raise ValueError(f"Formato no soportado: {path}")
@@ -1,22 +1,89 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import Response
 from backend.models import (
-    ScoreRequest, ScoreResponse, GeocodeResponse, 
-    Location, WindowScore, Safety, RawMetrics
+    ScoreRequest, ScoreResponse, GeocodeResponse, DailySummaryResponse,
+    Location, WindowScore, Safety, BoatType, SkillLevel,
+    AlertRuleRequest, AlertRule, PassageRequest, PassageResponse, EnsembleRequest, EnsembleResponse
 )
 from backend.services.geocode import geocode_location
-from backend.services.openmeteo import fetch_weather_data, sample_hourly_to_3h
-from backend.services.marine import fetch_marine_data, sample_marine_to_3h
-from backend.scoring.combined import create_window_score, check_no_go
-from typing import Optional, Dict, Tuple
+from backend.services.providers import provider_from_env
+from backend.services.live import LiveHub, LIVE_QUEUE_SIZE
+from backend.alerts.rules import AlertEngine
+from backend.alerts.sinks import sink_from_env
+from backend.services import forecast_cache
+from backend.services.forecast_cache import CACHE_TTL
+from backend.services.ensemble import ENSEMBLE_VARIABLES
+from backend.scoring.combined import check_no_go
+from backend.scoring.batch import (
+    extract_columns, build_windows, metrics_at, SCORING_WEATHER_VARIABLES, SCORING_MARINE_VARIABLES
+)
+from backend.scoring.executor import ScoringExecutor
+from backend.scoring.daily import summarize_days
+from backend.scoring.passage import plan_passage
+from backend.scoring.ensemble import ensemble_windows
+from backend.utils.serialization import dumps, to_compact, compress, preferred_encoding
+from backend.utils.http_cache import make_etag, etag_matches, cache_headers
+from backend.utils.profiling import Profiler, ProfilingMiddleware, ADMIN_TOKEN, stage
+from pydantic import ValidationError
+from typing import Literal, List, Optional, Dict, Tuple
 from datetime import datetime
+from contextlib import asynccontextmanager
+from collections import OrderedDict
 import asyncio
+import contextvars
+import json
+import logging
 import os
 
 
-app = FastAPI(title="Sailing Day Score API")
+SCORING_EXECUTOR = ScoringExecutor()
+
+# Origen de los datos horarios: Open-Meteo, grabaciones locales o datos sintéticos
+FORECAST_PROVIDER = provider_from_env()
+
+# Reglas de alerta indexadas por celda. Se evalúan siempre sobre el mismo tramo de forecast
+# (desde hoy, ALERT_HORIZON_DAYS días, en ALERT_TIMEZONE) para que el estado de cada regla
+# no dependa de qué petición descargó la celda. Con varios workers, ALERT_RULES_PATH es el
+# almacén compartido y solo un proceso evalúa y notifica
+ALERT_ENGINE = AlertEngine(os.environ.get("ALERT_RULES_PATH"))
+ALERT_SINK = sink_from_env()
+ALERT_HORIZON_DAYS = 7
+ALERT_TIMEZONE = os.environ.get("ALERT_TIMEZONE", "Europe/Madrid")
+
+ALERT_LOGGER = logging.getLogger("backend.alerts")
+LIVE_LOGGER = logging.getLogger("backend.live")
+
+# Desglose por etapas de las peticiones lentas y perfiles de pila muestreados
+PROFILER = Profiler()
+
+# Referencias a tareas en segundo plano para que no las recolecte el GC
+BACKGROUND_TASKS: set = set()
+
+
+def run_in_background(coro) -> None:
+    # Contexto vacío: la tarea no hereda las etapas de perfilado de la petición que la lanza
+    task = asyncio.create_task(coro, context=contextvars.Context())
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(BACKGROUND_TASKS.discard)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # El pool arranca en segundo plano: la app atiende desde el primer momento y
+    # puntúa en línea hasta que los workers están listos
+    pool_start = asyncio.create_task(asyncio.to_thread(SCORING_EXECUTOR.start))
+    sweeper = asyncio.create_task(alert_sweeper())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+        await LIVE_HUB.close()
+        await asyncio.gather(pool_start, return_exceptions=True)
+        SCORING_EXECUTOR.shutdown()
+
+
+app = FastAPI(title="Sailing Day Score API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,101 +93,239 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(ProfilingMiddleware, profiler=PROFILER)
+
+
+# Días del resumen diario ya serializables, cacheados aparte del forecast
+DAILY_CACHE: Dict[str, Tuple[List[Dict], float]] = {}
+
+# Los resultados de geocoding apenas cambian: se cachean un día, con un máximo de
+# entradas (LRU) porque la clave es texto libre del usuario
+GEOCODE_CACHE: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+GEOCODE_CACHE_TTL = 86400.0
+GEOCODE_CACHE_SIZE = int(os.environ.get("GEOCODE_CACHE_SIZE", "5000"))
+
 
-CACHE: Dict[str, Tuple[Tuple, float]] = {}
-CACHE_TTL = 600.0
+def get_cache_key(
+    lat: float, lon: float, date: str, boat_type: str = "", skill: str = "", days: int = 5, timezone: str = ""
+) -> str:
+    return f"{lat:.2f}_{lon:.2f}_{date}_{days}_{boat_type}_{skill}_{timezone}"
 
 
-def get_cache_key(lat: float, lon: float, date: str, boat_type: str = "", skill: str = "") -> str:
-    return f"{lat:.2f}_{lon:.2f}_{date}_{boat_type}_{skill}"
+def clean_expired_daily_cache():
+    """Limpia resúmenes diarios expirados"""
+    now = datetime.now().timestamp()
+    expired_keys = [key for key, (_, timestamp) in DAILY_CACHE.items() if now - timestamp >= CACHE_TTL]
+    for key in expired_keys:
+        del DAILY_CACHE[key]
 
 
-def clean_expired_cache():
-    """Limpia entradas expiradas del cache"""
+def clean_expired_geocode_cache():
+    """Limpia búsquedas de geocoding expiradas"""
     now = datetime.now().timestamp()
-    expired_keys = [key for key, (_, timestamp) in CACHE.items() if now - timestamp >= CACHE_TTL]
+    expired_keys = [key for key, (_, timestamp) in GEOCODE_CACHE.items() if now - timestamp >= GEOCODE_CACHE_TTL]
     for key in expired_keys:
-        del CACHE[key]
+        del GEOCODE_CACHE[key]
+
+
+def json_response(data: Dict, request: Request, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serializa y comprime una respuesta ya construida, sin volver a validarla"""
+    with stage("serialize"):
+        body, encoding = compress(dumps(data), request.headers.get("accept-encoding"))
+    response_headers = {"Vary": "Accept-Encoding"}
+    if headers:
+        response_headers.update(headers)
+    if encoding:
+        response_headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=response_headers)
+
+
+def conditional_headers(request: Request, fetched_at: float, ttl: float, *parts) -> Tuple[Dict[str, str], bool]:
+    """
+    Calcula ETag/Cache-Control/Age para una respuesta derivada de datos cacheados.
+    Retorna (cabeceras, True si el cliente ya tiene esta versión)
+    """
+    # La codificación forma parte del ETag: cada variante comprimida es una representación distinta
+    encoding = preferred_encoding(request.headers.get("accept-encoding"))
+    etag = make_etag(fetched_at, encoding, *parts)
+    headers = cache_headers(etag, fetched_at, ttl, datetime.now().timestamp())
+    return headers, etag_matches(request.headers.get("if-none-match"), etag)
+
+
+def not_modified(request: Request, headers: Dict[str, str]) -> Response:
+    """
+    Respuesta a un If-None-Match que coincide: 304 solo para GET/HEAD; en el resto de métodos
+    la precondición falla y corresponde 412 (RFC 9110 §13.1.2)
+    """
+    if request.method in ("GET", "HEAD"):
+        return Response(status_code=304, headers={"Vary": "Accept-Encoding", **headers})
+    return Response(status_code=412, headers={"ETag": headers["ETag"]})
 
 
 @app.get("/api/health")
 async def health():
-    return {"status": "ok"}
+    # Llamadas y latencia media del proveedor de forecast de este proceso
+    return {"status": "ok", "provider": FORECAST_PROVIDER.stats()}
 
 
 @app.get("/api/geocode", response_model=GeocodeResponse)
-async def geocode(q: str = Query(..., description="Nombre de ubicación")):
+async def geocode(http_request: Request, q: str = Query(..., description="Nombre de ubicación")):
     try:
-        results = await geocode_location(q)
-        return GeocodeResponse(results=results)
+        now = datetime.now().timestamp()
+        cache_key = q.strip().lower()
+        
+        cached = GEOCODE_CACHE.get(cache_key)
+        if cached is not None and now - cached[1] < GEOCODE_CACHE_TTL:
+            payload, fetched_at = cached
+            GEOCODE_CACHE.move_to_end(cache_key)
+        else:
+            clean_expired_geocode_cache()
+            results = await geocode_location(q)
+            payload = GeocodeResponse(results=results).model_dump()
+            fetched_at = now
+            GEOCODE_CACHE[cache_key] = (payload, fetched_at)
+            GEOCODE_CACHE.move_to_end(cache_key)
+            while len(GEOCODE_CACHE) > GEOCODE_CACHE_SIZE:
+                GEOCODE_CACHE.popitem(last=False)
+        
+        headers, fresh = conditional_headers(http_request, fetched_at, GEOCODE_CACHE_TTL, "geocode", cache_key)
+        if fresh:
+            return not_modified(http_request, headers)
+        return json_response(payload, http_request, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error en geocoding: {str(e)}")
 
 
-@app.post("/api/score", response_model=ScoreResponse)
-async def score(request: ScoreRequest):
+async def load_forecast(request: ScoreRequest) -> Tuple[Dict, Optional[Dict], float]:
+    """
+    Devuelve (weather_data, marine_data, fetched_at) desde el cache o pidiéndolos al proveedor de forecast.
+    Una entrada más amplia (más días o variables) sirve a peticiones más estrechas.
+    fetched_at es el instante de descarga y sirve para calcular ETag y Age.
+    """
+    with stage("fetch"):
+        return await _load_forecast(request)
+
+
+async def _load_forecast(request: ScoreRequest) -> Tuple[Dict, Optional[Dict], float]:
+    forecast_cache.clean_expired_cache()
+    
+    key = forecast_cache.get_location_key(request.lat, request.lon, request.timezone)
+    cached = forecast_cache.lookup(key, request.date, request.days, SCORING_WEATHER_VARIABLES, SCORING_MARINE_VARIABLES)
+    if cached is not None:
+        return cached
+    
+    now = datetime.now().timestamp()
+    weather_data, marine_data = await asyncio.gather(
+        FORECAST_PROVIDER.fetch_weather(
+            request.lat, request.lon, request.date, request.timezone, request.days, SCORING_WEATHER_VARIABLES
+        ),
+        FORECAST_PROVIDER.fetch_marine(
+            request.lat, request.lon, request.date, request.timezone, request.days, SCORING_MARINE_VARIABLES
+        )
+    )
+    forecast_cache.store(key, forecast_cache.CacheEntry(
+        weather_data, marine_data, request.date, request.days,
+        SCORING_WEATHER_VARIABLES, SCORING_MARINE_VARIABLES, now
+    ))
+    # Una descarga en una celda con reglas adelanta su evaluación sin esperar al barrido
+    ALERT_ENGINE.sync()
+    alert_cell = ALERT_ENGINE.profiles_for_cell(request.lat, request.lon)
+    if alert_cell and request != alert_request(request.lat, request.lon):
+        run_in_background(check_alerts(request.lat, request.lon))
+    return weather_data, marine_data, now
+
+
+def alert_request(lat: float, lon: float) -> ScoreRequest:
+    """Tramo de forecast fijo sobre el que se evalúan las alertas de una celda"""
+    return ScoreRequest(
+        lat=round(lat, 2), lon=round(lon, 2), boat_type=BoatType.DINGHY, skill=SkillLevel.INTERMEDIO,
+        date=datetime.now().strftime("%Y-%m-%d"), timezone=ALERT_TIMEZONE, days=ALERT_HORIZON_DAYS
+    )
+
+
+async def check_alerts(lat: float, lon: float) -> None:
+    """Puntúa el tramo de alertas de la celda solo para los perfiles con reglas y notifica"""
+    if not ALERT_ENGINE.is_evaluator():
+        return
+    ALERT_ENGINE.sync()
+    profiles = ALERT_ENGINE.profiles_for_cell(lat, lon)
+    if not profiles:
+        return
     try:
-        clean_expired_cache()
-        
-        cache_key = get_cache_key(request.lat, request.lon, request.date, request.boat_type.value, request.skill.value)
-        now = datetime.now().timestamp()
-        
-        if cache_key in CACHE:
-            cached_data, timestamp = CACHE[cache_key]
-            if now - timestamp < CACHE_TTL:
-                weather_data, marine_data = cached_data
-            else:
-                del CACHE[cache_key]
-                weather_data, marine_data = await asyncio.gather(
-                    fetch_weather_data(request.lat, request.lon, request.date, request.timezone),
-                    fetch_marine_data(request.lat, request.lon, request.date, request.timezone)
-                )
-                CACHE[cache_key] = ((weather_data, marine_data), now)
-        else:
-            weather_data, marine_data = await asyncio.gather(
-                fetch_weather_data(request.lat, request.lon, request.date, request.timezone),
-                fetch_marine_data(request.lat, request.lon, request.date, request.timezone)
-            )
-            CACHE[cache_key] = ((weather_data, marine_data), now)
-        
+        weather_data, marine_data, _ = await load_forecast(alert_request(lat, lon))
         if "hourly" not in weather_data:
-            raise HTTPException(status_code=500, detail="No se pudieron obtener datos meteorológicos")
-        
-        weather_samples = sample_hourly_to_3h(weather_data["hourly"])
-        marine_samples = []
-        if marine_data and "hourly" in marine_data:
-            marine_samples = sample_marine_to_3h(marine_data["hourly"])
-        
-        windows = []
-        for i, w_sample in enumerate(weather_samples):
-            wave_hs = None
-            wave_tp = None
-            wave_dir = None
-            
-            if i < len(marine_samples):
-                m_sample = marine_samples[i]
-                wave_hs = m_sample.get("wave_height")
-                wave_tp = m_sample.get("wave_period")
-                wave_dir = m_sample.get("wave_direction")
-            
-            metrics = RawMetrics(
-                wind_kn=w_sample["wind_speed"] * 0.539957,
-                gust_kn=w_sample["wind_gust"] * 0.539957,
-                wave_hs_m=wave_hs,
-                wave_tp_s=wave_tp,
-                wave_dir_deg=wave_dir,
-                wind_dir_deg=w_sample["wind_direction"],
-                precip_mm_h=w_sample["precipitation"],
-                temp_c=w_sample["temperature"]
-            )
-            
-            window = create_window_score(
-                w_sample["time"],
-                metrics,
-                request.boat_type,
-                request.skill
+            return
+        columns = extract_columns(weather_data["hourly"], marine_data.get("hourly") if marine_data else None)
+        results = await SCORING_EXECUTOR.score(columns, profiles)
+        metrics = [metrics_at(columns, i) for i in range(len(columns["time"]))]
+        series = {
+            (boat_type, skill): (
+                [result[0] for result in profile_results],
+                [check_no_go(m, skill)[0] for m in metrics]
             )
-            windows.append(window)
+            for (boat_type, skill), profile_results in zip(profiles, results)
+        }
+        notifications = ALERT_ENGINE.evaluate(lat, lon, columns["time"], series)
+        await ALERT_SINK.send(notifications)
+    except Exception:
+        # Un fallo al notificar no debe afectar a la petición que descargó el forecast
+        ALERT_LOGGER.exception("Fallo al evaluar o notificar las alertas de la celda %.2f, %.2f", lat, lon)
+
+
+async def alert_sweeper():
+    """Recorre periódicamente las celdas con reglas para que se refresquen aunque nadie las consulte"""
+    while True:
+        # Los workers que no evalúan reintentan el bloqueo en cada vuelta por si el evaluador termina
+        if ALERT_ENGINE.is_evaluator():
+            ALERT_ENGINE.sync()
+            for lat, lon in list(ALERT_ENGINE.cells().values()):
+                await check_alerts(lat, lon)
+        await asyncio.sleep(CACHE_TTL)
+
+
+async def score_windows(request: ScoreRequest, weather_data: Dict, marine_data: Optional[Dict]) -> List[WindowScore]:
+    """Puntúa todas las ventanas de 3h de un forecast ya descargado"""
+    if "hourly" not in weather_data:
+        raise HTTPException(status_code=500, detail="No se pudieron obtener datos meteorológicos")
+    
+    with stage("sample"):
+        columns = extract_columns(
+            weather_data["hourly"],
+            marine_data.get("hourly") if marine_data else None
+        )
+    [results] = await SCORING_EXECUTOR.score(columns, [(request.boat_type, request.skill)])
+    return build_windows(columns, results)
+
+
+def request_location(request: ScoreRequest) -> Location:
+    return Location(
+        name=f"Lat {request.lat:.2f}, Lon {request.lon:.2f}",
+        lat=request.lat,
+        lon=request.lon
+    )
+
+
+def request_parts(request: ScoreRequest) -> Tuple:
+    """
+    Parámetros de la petición que determinan el cuerpo de la respuesta (para el ETag).
+    lat/lon van con la misma precisión con la que se devuelven en `location`.
+    """
+    return (
+        repr(request.lat), repr(request.lon), request.date, request.days, request.timezone,
+        request.boat_type.value, request.skill.value
+    )
+
+
+async def score_response(request: ScoreRequest, http_request: Request, format: str) -> Response:
+    try:
+        weather_data, marine_data, fetched_at = await load_forecast(request)
+        
+        # Si el cliente ya tiene esta versión del forecast no hace falta puntuar ni serializar
+        headers, fresh = conditional_headers(http_request, fetched_at, CACHE_TTL, "score", format, *request_parts(request))
+        if fresh:
+            return not_modified(http_request, headers)
+        
+        windows = await score_windows(request, weather_data, marine_data)
         
         best_window = None
         if windows:
@@ -134,28 +339,297 @@ async def score(request: ScoreRequest):
                 no_go_reasons.extend(check[1])
             no_go_reasons = list(set(no_go_reasons))
         
-        location = Location(
-            name=f"Lat {request.lat:.2f}, Lon {request.lon:.2f}",
-            lat=request.lat,
-            lon=request.lon
-        )
-        
-        return ScoreResponse(
-            location=location,
+        response = ScoreResponse(
+            location=request_location(request),
             windows=windows,
             best_window=best_window,
             safety=Safety(no_go=any_no_go, why=no_go_reasons)
         )
         
+        # Los modelos ya están validados: se serializan directamente sin pasar por response_model
+        with stage("serialize"):
+            payload = response.model_dump()
+            if format == "compact":
+                payload = to_compact(payload)
+        return json_response(payload, http_request, headers=headers)
+        
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al calcular score: {str(e)}")
 
 
+@app.post("/api/score", response_model=ScoreResponse)
+async def score(
+    request: ScoreRequest,
+    http_request: Request,
+    format: Literal["full", "compact"] = Query("full", description="compact envía las métricas raw como columnas")
+):
+    return await score_response(request, http_request, format)
+
+
+@app.get("/api/score", response_model=ScoreResponse)
+async def score_get(
+    http_request: Request,
+    lat: float,
+    lon: float,
+    boat_type: BoatType,
+    skill: SkillLevel,
+    date: str,
+    timezone: str = "Europe/Madrid",
+    days: int = Query(5, ge=1, le=16),
+    format: Literal["full", "compact"] = Query("full", description="compact envía las métricas raw como columnas")
+):
+    """Variante GET de /api/score, cacheable por navegadores y CDN"""
+    request = ScoreRequest(lat=lat, lon=lon, boat_type=boat_type, skill=skill, date=date, timezone=timezone, days=days)
+    return await score_response(request, http_request, format)
+
+
+@app.post("/api/score/daily", response_model=DailySummaryResponse)
+async def score_daily(request: ScoreRequest, http_request: Request):
+    try:
+        clean_expired_daily_cache()
+        
+        cache_key = get_cache_key(
+            request.lat, request.lon, request.date, request.boat_type.value, request.skill.value, request.days,
+            request.timezone
+        )
+        now = datetime.now().timestamp()
+        
+        cached = DAILY_CACHE.get(cache_key)
+        if cached is not None and now - cached[1] < CACHE_TTL:
+            days, fetched_at = cached
+        else:
+            weather_data, marine_data, fetched_at = await load_forecast(request)
+            windows = await score_windows(request, weather_data, marine_data)
+            days = [day.model_dump() for day in summarize_days(windows, request.skill)]
+            # Se guarda con el instante de descarga del forecast para que caduquen a la vez
+            DAILY_CACHE[cache_key] = (days, fetched_at)
+
+        # La clave agrupa coordenadas a 2 decimales: la ubicación se construye con las de cada petición
+        payload = {"location": request_location(request).model_dump(), "days": days}
+        
+        headers, fresh = conditional_headers(http_request, fetched_at, CACHE_TTL, "daily", *request_parts(request))
+        if fresh:
+            return not_modified(http_request, headers)
+        return json_response(payload, http_request, headers=headers)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al calcular resumen diario: {str(e)}")
+
+
+async def load_marine(request: ScoreRequest) -> Tuple[Optional[Dict], float]:
+    """
+    Solo el forecast marino, con su fetched_at: sirve cualquier entrada del cache que lo cubra y,
+    si no hay, descarga únicamente la API marina y la guarda como entrada sin variables meteorológicas.
+    """
+    with stage("fetch"):
+        key = forecast_cache.get_location_key(request.lat, request.lon, request.timezone)
+        cached = forecast_cache.lookup(key, request.date, request.days, (), SCORING_MARINE_VARIABLES)
+        if cached is not None:
+            return cached[1], cached[2]
+
+        now = datetime.now().timestamp()
+        marine_data = await FORECAST_PROVIDER.fetch_marine(
+            request.lat, request.lon, request.date, request.timezone, request.days, SCORING_MARINE_VARIABLES
+        )
+        forecast_cache.store(key, forecast_cache.CacheEntry(
+            {}, marine_data, request.date, request.days, (), SCORING_MARINE_VARIABLES, now
+        ))
+        return marine_data, now
+
+
+async def load_ensemble(request: EnsembleRequest) -> Tuple[Dict[str, Dict], Optional[Dict], List[float]]:
+    """
+    Devuelve (bloque `hourly` de cada modelo, marine_data, fetched_at del forecast marino y de cada modelo).
+    Cada modelo se cachea por separado con todos sus miembros, así que distintas combinaciones
+    de modelos comparten descargas; los modelos que faltan se piden en paralelo.
+    """
+    key = forecast_cache.get_location_key(request.lat, request.lon, request.timezone)
+    forecasts: Dict[str, Tuple[Dict, float]] = {}
+    missing = []
+    for model in request.models:
+        cached = forecast_cache.lookup(f"{key}|{model}", request.date, request.days, ENSEMBLE_VARIABLES, ())
+        if cached is None:
+            missing.append(model)
+        else:
+            forecasts[model] = (cached[0], cached[2])
+
+    now = datetime.now().timestamp()
+    (marine_data, marine_fetched), *fetched = await asyncio.gather(
+        load_marine(request),
+        *(
+            FORECAST_PROVIDER.fetch_ensemble(
+                request.lat, request.lon, request.date, request.timezone, request.days, model, ENSEMBLE_VARIABLES
+            )
+            for model in missing
+        )
+    )
+    for model, data in zip(missing, fetched):
+        forecast_cache.store(f"{key}|{model}", forecast_cache.CacheEntry(
+            data, None, request.date, request.days, ENSEMBLE_VARIABLES, (), now
+        ))
+        forecasts[model] = (data, now)
+
+    hourly = {model: forecasts[model][0]["hourly"] for model in request.models if "hourly" in forecasts[model][0]}
+    return hourly, marine_data, [marine_fetched, *(forecasts[model][1] for model in request.models)]
+
+
+@app.post("/api/score/ensemble", response_model=EnsembleResponse)
+async def score_ensemble(request: EnsembleRequest, http_request: Request):
+    """Puntúa todos los miembros de uno o varios modelos de ensemble y devuelve bandas por ventana"""
+    try:
+        forecasts, marine_data, fetched = await load_ensemble(request)
+
+        headers, fresh = conditional_headers(
+            http_request, min(fetched), CACHE_TTL, "ensemble", *fetched, *request.models, *request_parts(request)
+        )
+        if fresh:
+            return not_modified(http_request, headers)
+
+        # Separar, puntuar y resumir los miembros es un único trabajo: el executor decide si va
+        # al pool de procesos según las ventanas a 3h de todos los miembros (columnas / variables)
+        columns = sum(len(hourly["time"]) * len(hourly) for hourly in forecasts.values())
+        size = columns // (3 * len(ENSEMBLE_VARIABLES))
+        members, windows = await SCORING_EXECUTOR.run(
+            size, ensemble_windows, forecasts, marine_data.get("hourly") if marine_data else None,
+            request.boat_type, request.skill
+        )
+        if not members:
+            raise HTTPException(status_code=500, detail="No se pudieron obtener miembros del ensemble")
+
+        response = EnsembleResponse(
+            location=request_location(request),
+            models=request.models,
+            members=members,
+            windows=windows
+        )
+        return json_response(response.model_dump(), http_request, headers=headers)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al calcular el ensemble: {str(e)}")
+
+
+@app.post("/api/passage", response_model=PassageResponse)
+async def passage(request: PassageRequest, http_request: Request):
+    """Puntúa una travesía por waypoints a lo largo de su ETA y busca la mejor hora de salida"""
+    try:
+        response = await plan_passage(request, load_forecast, SCORING_EXECUTOR.score)
+        return json_response(response.model_dump(), http_request)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al puntuar la travesía: {str(e)}")
+
+
+@app.post("/api/alerts", response_model=AlertRule, status_code=201)
+async def create_alert(rule: AlertRuleRequest):
+    try:
+        rule_id = ALERT_ENGINE.add_rule(**rule.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return AlertRule(id=rule_id, **rule.model_dump())
+
+
+@app.get("/api/alerts/{rule_id}", response_model=AlertRule)
+async def get_alert(rule_id: str):
+    ALERT_ENGINE.sync()
+    rule = ALERT_ENGINE.get_rule(rule_id)
+    if rule is None:
+        raise HTTPException(status_code=404, detail="Alerta no encontrada")
+    return AlertRule(**rule)
+
+
+@app.delete("/api/alerts/{rule_id}")
+async def delete_alert(rule_id: str):
+    ALERT_ENGINE.sync()
+    if not ALERT_ENGINE.remove_rule(rule_id):
+        raise HTTPException(status_code=404, detail="Alerta no encontrada")
+    return {"deleted": True}
+
+
+@app.get("/api/admin/profiles")
+async def admin_profiles(
+    http_request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    path: Optional[str] = None,
+    reason: Optional[Literal["slow", "sampled", "header"]] = None
+):
+    """Perfiles recientes: peticiones lentas con su desglose por etapas y pilas muestreadas"""
+    # Los perfiles incluyen las queries (coordenadas de los usuarios): sin ADMIN_TOKEN no se sirven
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    if http_request.headers.get("x-admin-token") != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Token de administración no válido")
+    return {
+        "sample_rate": PROFILER.sample_rate,
+        "slow_ms": PROFILER.slow_ms,
+        "profiles": PROFILER.recent(limit, path, reason)
+    }
+
+
+# Una tarea de refresco por spot comparte la descarga entre todas las conexiones suscritas
+LIVE_HUB = LiveHub(load_forecast, score_windows, CACHE_TTL)
+
+
+async def forward_messages(queue: asyncio.Queue, websocket: WebSocket):
+    while True:
+        await websocket.send_text(await queue.get())
+
+
+@app.websocket("/api/ws")
+async def live_updates(websocket: WebSocket):
+    """
+    Canal de actualizaciones en vivo. El cliente envía
+    {"action": "subscribe", ...campos de ScoreRequest} o {"action": "unsubscribe", "subscription": id}
+    y recibe un snapshot inicial y después solo las ventanas cuyo score o NO-GO cambian.
+    """
+    await websocket.accept()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+    subscriptions = set()
+    sender = asyncio.create_task(forward_messages(queue, websocket))
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = json.loads(raw)
+                action = message.get("action") if isinstance(message, dict) else None
+                if action == "subscribe":
+                    request = ScoreRequest(**{k: v for k, v in message.items() if k != "action"})
+                    subscriptions.add(await LIVE_HUB.subscribe(queue, request))
+                elif action == "unsubscribe":
+                    subscription = message.get("subscription")
+                    LIVE_HUB.unsubscribe(queue, subscription)
+                    subscriptions.discard(subscription)
+                else:
+                    await queue.put(dumps({"type": "error", "detail": f"Acción desconocida: {action}"}).decode("utf-8"))
+            except (ValidationError, HTTPException, ValueError) as e:
+                await queue.put(dumps({"type": "error", "detail": str(e)}).decode("utf-8"))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        for subscription in subscriptions:
+            LIVE_HUB.unsubscribe(queue, subscription)
+        # Recoge el resultado del envío para que un fallo no quede sin registrar
+        [error] = await asyncio.gather(sender, return_exceptions=True)
+        if not isinstance(error, (type(None), asyncio.CancelledError, WebSocketDisconnect)):
+            LIVE_LOGGER.warning("Fallo al enviar actualizaciones en vivo: %r", error)
+
+
 FRONTEND_DIST = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend", "dist"))
 
+# El servidor de estáticos solo se importa y monta si hay un build del frontend
 if os.path.exists(FRONTEND_DIST):
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.responses import FileResponse
+
     app.mount("/assets", StaticFiles(directory=os.path.join(FRONTEND_DIST, "assets")), name="assets")
     
     @app.get("/{full_path:path}")
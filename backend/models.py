@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import AfterValidator, BaseModel, Field, StringConstraints
+from typing import Annotated, List, Literal, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -34,6 +34,7 @@ class ScoreRequest(BaseModel):
     skill: SkillLevel
     date: str
     timezone: str = "Europe/Madrid"
+    days: int = Field(5, ge=1, le=16, description="Horizonte en días desde date")
 
 
 class RawMetrics(BaseModel):
@@ -68,6 +69,131 @@ class ScoreResponse(BaseModel):
     safety: Safety
 
 
+class BestWindowSummary(BaseModel):
+    time: str
+    score: int
+    label: str
+
+
+class DaySummary(BaseModel):
+    date: str
+    max_score: int
+    mean_score: float
+    sailable_hours: int
+    best_window: BestWindowSummary
+    reasons: List[str]
+    safety: Safety
+
+
+class DailySummaryResponse(BaseModel):
+    location: Location
+    days: List[DaySummary]
+
+
+# Identificador de modelo de Open-Meteo (icon_seamless, gfs025, ecmwf_ifs025...): va a la query,
+# a la clave del cache y a nombres de fichero, así que solo se aceptan minúsculas, dígitos y "_"
+EnsembleModel = Annotated[str, StringConstraints(pattern=r"^[a-z0-9_]{1,48}$")]
+
+
+class EnsembleRequest(ScoreRequest):
+    models: List[EnsembleModel] = Field(
+        ["icon_seamless"], min_length=1, max_length=4, description="Modelos de la API de ensembles de Open-Meteo"
+    )
+
+
+class EnsembleWindow(BaseModel):
+    time: str
+    p10: float
+    p50: float
+    p90: float
+    no_go_probability: float
+    members: int
+
+
+class EnsembleResponse(BaseModel):
+    location: Location
+    models: List[str]
+    members: int
+    windows: List[EnsembleWindow]
+
+
+def check_local_time(value: str) -> str:
+    """Acepta solo horas locales ISO sin zona, comparables con las horas del forecast"""
+    if datetime.fromisoformat(value).tzinfo is not None:
+        raise ValueError("La hora debe ser local, sin zona horaria (YYYY-MM-DDTHH:MM)")
+    return value
+
+
+# Hora local ISO en la zona del forecast; las horas con desfase no se pueden comparar con sus series
+LocalTime = Annotated[str, AfterValidator(check_local_time)]
+
+
+class AlertRuleRequest(BaseModel):
+    lat: float
+    lon: float
+    boat_type: BoatType
+    skill: SkillLevel
+    kind: Literal["score_above", "no_go_clears"] = "score_above"
+    threshold: int = Field(75, ge=0, le=100)
+    start: Optional[LocalTime] = Field(None, description="Inicio del periodo vigilado (hora local ISO)")
+    end: Optional[LocalTime] = Field(None, description="Fin del periodo vigilado (hora local ISO)")
+    contact: Optional[str] = None
+
+
+class AlertRule(AlertRuleRequest):
+    id: str
+
+
+class Waypoint(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+
+
+class PassageRequest(BaseModel):
+    waypoints: List[Waypoint] = Field(..., min_length=2, max_length=50)
+    speed_kn: float = Field(..., gt=0, le=40, description="Velocidad media prevista")
+    departure: LocalTime = Field(..., description="Salida prevista (hora local ISO, YYYY-MM-DDTHH:MM)")
+    boat_type: BoatType
+    skill: SkillLevel
+    timezone: str = "Europe/Madrid"
+    search_hours: int = Field(24, ge=0, le=72, description="Se prueban salidas hasta estas horas después")
+    search_step_hours: int = Field(3, ge=1, le=24, description="Intervalo entre salidas probadas")
+
+
+class PassagePoint(BaseModel):
+    eta: str
+    lat: float
+    lon: float
+    distance_nm: float
+    score: Optional[int] = None
+    label: Optional[str] = None
+    reasons: List[str] = []
+    no_go: bool = False
+
+
+class DepartureOption(BaseModel):
+    departure: str
+    arrival: str
+    mean_score: Optional[float] = None
+    min_score: Optional[int] = None
+    no_go: bool
+    complete: bool
+
+
+class PassagePlan(DepartureOption):
+    why: List[str]
+    points: List[PassagePoint]
+
+
+class PassageResponse(BaseModel):
+    distance_nm: float
+    duration_hours: float
+    cells: int
+    requested: PassagePlan
+    best: Optional[PassagePlan] = None
+    departures: List[DepartureOption]
+
+
 class GeocodeResult(BaseModel):
     name: str
     lat: float
@@ -0,0 +1,146 @@
+from backend.models import BoatType, SkillLevel, RawMetrics, WindowScore
+from backend.scoring.combined import calculate_score
+from backend.services.openmeteo import sample_hourly_to_3h, WEATHER_VARIABLES
+from backend.services.marine import sample_marine_to_3h, MARINE_VARIABLES
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+KMH_TO_KN = 0.539957
+
+METRIC_COLUMNS = (
+    "wind_kn", "gust_kn", "wave_hs_m", "wave_tp_s",
+    "wave_dir_deg", "wind_dir_deg", "precip_mm_h", "temp_c"
+)
+
+# Variables de Open-Meteo que consume el scoring; es lo único que se descarga
+SCORING_WEATHER_VARIABLES = WEATHER_VARIABLES
+SCORING_MARINE_VARIABLES = MARINE_VARIABLES
+
+ScoreResult = Tuple[int, str, List[str], List[str]]
+
+Profile = Tuple[BoatType, SkillLevel]
+
+ALL_PROFILES: List[Profile] = [(boat_type, skill) for boat_type in BoatType for skill in SkillLevel]
+
+
+def _to_float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def extract_columns(
+    weather_hourly: Dict,
+    marine_hourly: Optional[Dict] = None,
+    skip_incomplete: bool = False
+) -> Dict[str, List]:
+    """
+    Samplea los datos horarios a 3h y los devuelve como columnas
+    (time + METRIC_COLUMNS), listas para puntuar en bloque o enviar a otro proceso.
+    Con skip_incomplete se descartan las ventanas sin viento, rachas, precipitación o temperatura.
+    """
+    weather_samples = sample_hourly_to_3h(weather_hourly)
+    marine_samples = sample_marine_to_3h(marine_hourly) if marine_hourly else []
+
+    columns: Dict[str, List] = {"time": []}
+    for name in METRIC_COLUMNS:
+        columns[name] = []
+
+    for i, w_sample in enumerate(weather_samples):
+        if skip_incomplete and any(
+            w_sample[name] is None for name in ("wind_speed", "wind_gust", "precipitation", "temperature")
+        ):
+            continue
+        m_sample = marine_samples[i] if i < len(marine_samples) else {}
+        columns["time"].append(w_sample["time"])
+        columns["wind_kn"].append(w_sample["wind_speed"] * KMH_TO_KN)
+        columns["gust_kn"].append(w_sample["wind_gust"] * KMH_TO_KN)
+        columns["wave_hs_m"].append(_to_float(m_sample.get("wave_height")))
+        columns["wave_tp_s"].append(_to_float(m_sample.get("wave_period")))
+        columns["wave_dir_deg"].append(_to_float(m_sample.get("wave_direction")))
+        columns["wind_dir_deg"].append(_to_float(w_sample["wind_direction"]))
+        columns["precip_mm_h"].append(float(w_sample["precipitation"]))
+        columns["temp_c"].append(float(w_sample["temperature"]))
+
+    return columns
+
+
+def select_hours(
+    weather_hourly: Dict,
+    marine_hourly: Optional[Dict],
+    times: Sequence[str]
+) -> Dict[str, List]:
+    """
+    Columnas (time + METRIC_COLUMNS) de las horas pedidas, sin muestrear a 3h.
+    Se omiten las horas que no están en el forecast o no tienen viento, rachas, precipitación o temperatura.
+    """
+    weather_index = {time: i for i, time in enumerate(weather_hourly.get("time", []))}
+    marine_index = {time: i for i, time in enumerate(marine_hourly.get("time", []))} if marine_hourly else {}
+    wind = weather_hourly.get("windspeed_10m", [])
+    gust = weather_hourly.get("windgusts_10m", [])
+    precip = weather_hourly.get("precipitation", [])
+    temp = weather_hourly.get("temperature_2m", [])
+    wind_dir = weather_hourly.get("winddirection_10m", [])
+    marine = {
+        name: marine_hourly.get(name, []) if marine_hourly else []
+        for name in ("wave_height", "wave_period", "wave_direction")
+    }
+
+    columns: Dict[str, List] = {"time": []}
+    for name in METRIC_COLUMNS:
+        columns[name] = []
+
+    for time in times:
+        i = weather_index.get(time)
+        if i is None or i >= len(wind) or i >= len(temp):
+            continue
+        if wind[i] is None or gust[i] is None or precip[i] is None or temp[i] is None:
+            continue
+        j = marine_index.get(time)
+
+        def marine_value(name: str) -> Optional[float]:
+            values = marine[name]
+            return _to_float(values[j]) if j is not None and j < len(values) else None
+
+        columns["time"].append(time)
+        columns["wind_kn"].append(wind[i] * KMH_TO_KN)
+        columns["gust_kn"].append(gust[i] * KMH_TO_KN)
+        columns["wave_hs_m"].append(marine_value("wave_height"))
+        columns["wave_tp_s"].append(marine_value("wave_period"))
+        columns["wave_dir_deg"].append(marine_value("wave_direction"))
+        columns["wind_dir_deg"].append(_to_float(wind_dir[i]) if i < len(wind_dir) else None)
+        columns["precip_mm_h"].append(float(precip[i]))
+        columns["temp_c"].append(float(temp[i]))
+
+    return columns
+
+
+def metrics_at(columns: Dict[str, List], i: int) -> RawMetrics:
+    """Construye las RawMetrics de la fila i sin volver a validar los datos"""
+    return RawMetrics.model_construct(**{name: columns[name][i] for name in METRIC_COLUMNS})
+
+
+def score_columns(columns: Dict[str, List], boat_type: BoatType, skill: SkillLevel) -> List[ScoreResult]:
+    """Puntúa todas las filas de las columnas para un perfil barco/nivel"""
+    return [
+        calculate_score(metrics_at(columns, i), boat_type, skill)
+        for i in range(len(columns["time"]))
+    ]
+
+
+def score_profiles(columns: Dict[str, List], profiles: Sequence[Tuple[BoatType, SkillLevel]]) -> List[List[ScoreResult]]:
+    """Puntúa las mismas columnas para varios perfiles (unidad de trabajo del pool de procesos)"""
+    return [score_columns(columns, boat_type, skill) for boat_type, skill in profiles]
+
+
+def build_windows(columns: Dict[str, List], results: List[ScoreResult]) -> List[WindowScore]:
+    """Combina columnas y resultados de scoring en modelos WindowScore"""
+    windows = []
+    for i, (score, label, reasons, flags) in enumerate(results):
+        windows.append(WindowScore.model_construct(
+            time=columns["time"][i],
+            score=score,
+            label=label,
+            reasons=reasons,
+            flags=flags,
+            raw=metrics_at(columns, i)
+        ))
+    return windows
@@ -0,0 +1,72 @@
+from backend.models import SkillLevel, WindowScore, DaySummary, BestWindowSummary, Safety
+from backend.scoring.combined import check_no_go
+from collections import Counter
+from typing import Dict, List
+import re
+
+
+# Cada ventana representa 3 horas de navegación
+WINDOW_HOURS = 3
+
+# Desde "A valorar con mucha cautela" hacia arriba se considera navegable
+SAILABLE_MIN_SCORE = 45
+
+MAX_DAY_REASONS = 3
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def summarize_days(windows: List[WindowScore], skill: SkillLevel) -> List[DaySummary]:
+    """
+    Agrega las ventanas por día en una sola pasada: score máximo y medio,
+    horas navegables, mejor ventana, estado NO-GO y razones dominantes.
+    """
+    days: Dict[str, Dict] = {}
+
+    for window in windows:
+        date = window.time[:10]
+        day = days.get(date)
+        if day is None:
+            day = days[date] = {
+                "total": 0,
+                "count": 0,
+                "sailable": 0,
+                "best": window,
+                "no_go_reasons": [],
+                "reasons": Counter(),
+                "examples": {}
+            }
+
+        day["total"] += window.score
+        day["count"] += 1
+        if window.score > day["best"].score:
+            day["best"] = window
+
+        is_no_go, no_go_reasons = check_no_go(window.raw, skill)
+        if is_no_go:
+            for reason in no_go_reasons:
+                if reason not in day["no_go_reasons"]:
+                    day["no_go_reasons"].append(reason)
+        elif window.score >= SAILABLE_MIN_SCORE:
+            day["sailable"] += 1
+
+        # Agrupa razones que solo difieren en los valores numéricos
+        for reason in window.reasons:
+            key = _NUMBER_RE.sub("#", reason)
+            day["reasons"][key] += 1
+            day["examples"].setdefault(key, reason)
+
+    summaries = []
+    for date, day in days.items():
+        best = day["best"]
+        summaries.append(DaySummary(
+            date=date,
+            max_score=best.score,
+            mean_score=round(day["total"] / day["count"], 1),
+            sailable_hours=day["sailable"] * WINDOW_HOURS,
+            best_window=BestWindowSummary(time=best.time, score=best.score, label=best.label),
+            reasons=[day["examples"][key] for key, _ in day["reasons"].most_common(MAX_DAY_REASONS)],
+            safety=Safety(no_go=bool(day["no_go_reasons"]), why=day["no_go_reasons"])
+        ))
+
+    return summaries
@@ -0,0 +1,78 @@
+from backend.models import BoatType, EnsembleWindow, SkillLevel
+from backend.scoring.batch import METRIC_COLUMNS, ScoreResult, extract_columns, metrics_at, score_profiles
+from backend.scoring.combined import check_no_go
+from backend.services.ensemble import split_members
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Percentil q (0-100) con interpolación lineal sobre valores ya ordenados"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lo = int(position)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (position - lo)
+
+
+def member_batch(members: Dict[str, Dict], marine_hourly: Optional[Dict]) -> Tuple[Dict[str, List], List[str]]:
+    """
+    Columnas a 3h de todos los miembros concatenadas en un único lote para puntuarlas de una vez,
+    y el miembro al que pertenece cada fila. El mar es determinista y se comparte entre miembros.
+    """
+    batch: Dict[str, List] = {"time": []}
+    for name in METRIC_COLUMNS:
+        batch[name] = []
+    row_members: List[str] = []
+    for member, hourly in members.items():
+        columns = extract_columns(hourly, marine_hourly, skip_incomplete=True)
+        for name, values in columns.items():
+            batch[name].extend(values)
+        row_members.extend([member] * len(columns["time"]))
+    return batch, row_members
+
+
+def summarize_members(batch: Dict[str, List], results: List[ScoreResult], skill: SkillLevel) -> List[EnsembleWindow]:
+    """Bandas p10/p50/p90 del score y probabilidad de NO-GO de cada ventana entre todos los miembros"""
+    scores: Dict[str, List[int]] = {}
+    no_go: Dict[str, int] = {}
+    for i, (score, _, _, _) in enumerate(results):
+        time = batch["time"][i]
+        scores.setdefault(time, []).append(score)
+        if check_no_go(metrics_at(batch, i), skill)[0]:
+            no_go[time] = no_go.get(time, 0) + 1
+
+    windows = []
+    for time in sorted(scores):
+        values = sorted(scores[time])
+        windows.append(EnsembleWindow(
+            time=time,
+            p10=round(percentile(values, 10), 1),
+            p50=round(percentile(values, 50), 1),
+            p90=round(percentile(values, 90), 1),
+            no_go_probability=round(no_go.get(time, 0) / len(values), 3),
+            members=len(values)
+        ))
+    return windows
+
+
+def ensemble_windows(
+    forecasts: Dict[str, Dict],
+    marine_hourly: Optional[Dict],
+    boat_type: BoatType,
+    skill: SkillLevel
+) -> Tuple[int, List[EnsembleWindow]]:
+    """
+    Separa los miembros de cada modelo, los puntúa en un único lote y resume las bandas
+    (unidad de trabajo del pool de procesos). Devuelve (número de miembros, ventanas):
+    al event loop solo vuelve el resumen por ventana, no las filas.
+    """
+    members: Dict[str, Dict] = {}
+    for model, hourly in forecasts.items():
+        for member, columns in split_members(hourly).items():
+            members[f"{model}:{member}"] = columns
+    if not members:
+        return 0, []
+    batch, _ = member_batch(members, marine_hourly)
+    [results] = score_profiles(batch, [(boat_type, skill)])
+    return len(members), summarize_members(batch, results, skill)
@@ -0,0 +1,81 @@
+from backend.models import BoatType, SkillLevel
+from backend.scoring.batch import ScoreResult, score_profiles
+from backend.utils.profiling import stage
+from typing import Callable, Dict, List, Sequence, Tuple, TypeVar
+import asyncio
+import os
+
+
+# Número de ventanas x perfiles a partir del cual el trabajo sale del event loop
+POOL_THRESHOLD = int(os.environ.get("SCORING_POOL_THRESHOLD", "400"))
+POOL_WORKERS = int(os.environ.get("SCORING_POOL_WORKERS", "2"))
+
+T = TypeVar("T")
+
+
+def _warmup() -> int:
+    """Fuerza la importación del scoring en el worker antes de la primera petición"""
+    return os.getpid()
+
+
+class ScoringExecutor:
+    """
+    Ejecuta trabajos de scoring en línea o en un pool de procesos según su tamaño.
+    Los trabajos pequeños se puntúan en el propio event loop; los grandes se envían
+    al pool como columnas planas para no bloquear al resto de peticiones.
+    """
+
+    def __init__(self, workers: int = POOL_WORKERS, threshold: int = POOL_THRESHOLD):
+        self.workers = workers
+        self.threshold = threshold
+        # concurrent.futures.ProcessPoolExecutor; se importa en start() para no cargar
+        # multiprocessing en procesos que nunca crean el pool
+        self._pool = None
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    def start(self) -> None:
+        """
+        Crea el pool y arranca todos sus workers.
+        El pool solo se publica cuando los workers están listos: mientras tanto se puntúa en línea.
+        """
+        if self.workers <= 0 or self._pool is not None:
+            return
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        futures = [pool.submit(_warmup) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+        self._pool = pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, size: int, fn: Callable[..., T], *args) -> T:
+        """
+        Ejecuta fn(*args) en línea o, si el trabajo (`size` ventanas x perfiles) es grande, en el pool.
+        fn debe ser una función de módulo y sus argumentos y resultado, serializables con pickle.
+        """
+        with stage("score"):
+            if self._pool is None or size < self.threshold:
+                return fn(*args)
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, fn, *args)
+
+    async def score(
+        self,
+        columns: Dict[str, List],
+        profiles: Sequence[Tuple[BoatType, SkillLevel]]
+    ) -> List[List[ScoreResult]]:
+        """Puntúa las columnas para cada perfil, devolviendo una lista de resultados por perfil"""
+        return await self.run(len(columns["time"]) * len(profiles), score_profiles, columns, list(profiles))
@@ -0,0 +1,208 @@
+from backend.models import (
+    ScoreRequest, PassageRequest, PassageResponse, PassagePlan, PassagePoint, DepartureOption, BoatType, SkillLevel
+)
+from backend.scoring.batch import METRIC_COLUMNS, ScoreResult, metrics_at, select_hours
+from backend.scoring.combined import check_no_go
+from backend.services.openmeteo import MAX_FORECAST_DAYS
+from backend.services.snapshot import to_minutes, from_minutes
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import math
+
+
+EARTH_RADIUS_NM = 3440.065
+
+# Resolución a la que se agrupan las posiciones: similar a la rejilla del modelo de forecast
+CELL_DEG = 0.1
+
+# Límites para que una travesía no dispare cientos de descargas
+MAX_PASSAGE_HOURS = 240
+MAX_CELLS = 60
+
+# (horas desde la salida, lat, lon, millas recorridas)
+RoutePoint = Tuple[float, float, float, float]
+Cell = Tuple[float, float]
+
+LoadForecast = Callable[[ScoreRequest], Awaitable[Tuple[Dict, Optional[Dict], float]]]
+ScoreBatch = Callable[[Dict[str, List], Sequence[Tuple[BoatType, SkillLevel]]], Awaitable[List[List[ScoreResult]]]]
+
+
+def haversine_nm(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distancia ortodrómica en millas náuticas"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def intermediate_point(lat1: float, lon1: float, lat2: float, lon2: float, fraction: float) -> Tuple[float, float]:
+    """Punto a `fraction` del arco de círculo máximo entre dos posiciones"""
+    delta = haversine_nm(lat1, lon1, lat2, lon2) / EARTH_RADIUS_NM
+    if delta < 1e-9:
+        return lat1, lon1
+    phi1, lambda1 = math.radians(lat1), math.radians(lon1)
+    phi2, lambda2 = math.radians(lat2), math.radians(lon2)
+    a = math.sin((1 - fraction) * delta) / math.sin(delta)
+    b = math.sin(fraction * delta) / math.sin(delta)
+    x = a * math.cos(phi1) * math.cos(lambda1) + b * math.cos(phi2) * math.cos(lambda2)
+    y = a * math.cos(phi1) * math.sin(lambda1) + b * math.cos(phi2) * math.sin(lambda2)
+    z = a * math.sin(phi1) + b * math.sin(phi2)
+    return math.degrees(math.atan2(z, math.hypot(x, y))), math.degrees(math.atan2(y, x))
+
+
+def route_positions(waypoints: Sequence[Tuple[float, float]], speed_kn: float) -> List[RoutePoint]:
+    """Posición estimada en la salida, a cada hora de navegación y a la llegada"""
+    legs = []
+    total = 0.0
+    for (lat1, lon1), (lat2, lon2) in zip(waypoints, waypoints[1:]):
+        distance = haversine_nm(lat1, lon1, lat2, lon2)
+        legs.append((lat1, lon1, lat2, lon2, total, distance))
+        total += distance
+
+    duration = total / speed_kn
+    if duration > MAX_PASSAGE_HOURS:
+        raise ValueError(f"La travesía dura {duration:.0f} h; el máximo es {MAX_PASSAGE_HOURS} h")
+
+    hours = [float(h) for h in range(int(math.floor(duration)) + 1)]
+    if duration - hours[-1] > 1e-6:
+        hours.append(duration)
+
+    positions = []
+    leg = 0
+    for hour in hours:
+        distance = min(hour * speed_kn, total)
+        while leg < len(legs) - 1 and distance > legs[leg][4] + legs[leg][5]:
+            leg += 1
+        lat1, lon1, lat2, lon2, start, length = legs[leg]
+        fraction = (distance - start) / length if length > 0 else 0.0
+        lat, lon = intermediate_point(lat1, lon1, lat2, lon2, min(1.0, max(0.0, fraction)))
+        positions.append((hour, lat, lon, distance))
+    return positions
+
+
+def snap_to_cell(lat: float, lon: float) -> Cell:
+    """Centro de la celda de CELL_DEG grados que contiene la posición"""
+    return round(round(lat / CELL_DEG) * CELL_DEG, 4), round(round(lon / CELL_DEG) * CELL_DEG, 4)
+
+
+def departure_candidates(departure: str, search_hours: int, step_hours: int) -> List[int]:
+    """Salidas a probar, en minutos desde 1970: la pedida y las siguientes cada step_hours"""
+    start = to_minutes(departure)
+    return [start + hours * 60 for hours in range(0, search_hours + 1, step_hours)]
+
+
+def eta_hour(departure: int, hours: float) -> str:
+    """Hora del forecast (en punto) más cercana a la ETA"""
+    minutes = departure + round(hours * 60)
+    return from_minutes(int(round(minutes / 60)) * 60)
+
+
+def _plan(
+    departure: int,
+    positions: Sequence[RoutePoint],
+    cells: Sequence[Cell],
+    scored: Dict[Tuple[Cell, str], Tuple[ScoreResult, bool, List[str]]]
+) -> PassagePlan:
+    points = []
+    why: List[str] = []
+    scores = []
+    for (hours, lat, lon, distance), cell in zip(positions, cells):
+        eta = eta_hour(departure, hours)
+        point = PassagePoint(eta=eta, lat=round(lat, 4), lon=round(lon, 4), distance_nm=round(distance, 1))
+        entry = scored.get((cell, eta))
+        if entry is not None:
+            (score, label, reasons, _), no_go, no_go_reasons = entry
+            point.score, point.label, point.reasons, point.no_go = score, label, reasons, no_go
+            scores.append(score)
+            for reason in no_go_reasons:
+                if reason not in why:
+                    why.append(reason)
+        points.append(point)
+
+    return PassagePlan(
+        departure=from_minutes(departure),
+        arrival=from_minutes(departure + round(positions[-1][0] * 60)),
+        mean_score=round(sum(scores) / len(scores), 1) if scores else None,
+        min_score=min(scores) if scores else None,
+        no_go=any(point.no_go for point in points),
+        complete=len(scores) == len(points),
+        why=why,
+        points=points
+    )
+
+
+def _rank(plan: PassagePlan) -> Tuple:
+    """Mejor salida: sin NO-GO, con el peor tramo más alto y después la media más alta"""
+    return (not plan.no_go, plan.min_score or 0, plan.mean_score or 0.0)
+
+
+async def plan_passage(request: PassageRequest, load: LoadForecast, score: ScoreBatch) -> PassageResponse:
+    """
+    Puntúa la travesía para la salida pedida y para las salidas alternativas.
+    Cada celda se descarga una sola vez (en paralelo) y cada par celda/hora se puntúa
+    una sola vez, en un único lote para todas las salidas.
+    """
+    waypoints = [(waypoint.lat, waypoint.lon) for waypoint in request.waypoints]
+    positions = route_positions(waypoints, request.speed_kn)
+    cells = [snap_to_cell(lat, lon) for _, lat, lon, _ in positions]
+    unique_cells = list(dict.fromkeys(cells))
+    if len(unique_cells) > MAX_CELLS:
+        raise ValueError(f"La ruta atraviesa {len(unique_cells)} celdas; el máximo es {MAX_CELLS}")
+
+    departures = departure_candidates(request.departure, request.search_hours, request.search_step_hours)
+
+    # Horas que hacen falta en cada celda para todas las salidas candidatas
+    needed: Dict[Cell, Dict[str, None]] = {cell: {} for cell in unique_cells}
+    for departure in departures:
+        for (hours, _, _, _), cell in zip(positions, cells):
+            needed[cell][eta_hour(departure, hours)] = None
+
+    first_day = from_minutes(departures[0])[:10]
+    last_minutes = departures[-1] + round(positions[-1][0] * 60) + 60
+    days = max(1, min(MAX_FORECAST_DAYS, -(-(last_minutes - to_minutes(f"{first_day}T00:00")) // 1440)))
+
+    forecasts = await asyncio.gather(*(
+        load(ScoreRequest(
+            lat=lat, lon=lon, boat_type=request.boat_type, skill=request.skill,
+            date=first_day, timezone=request.timezone, days=days
+        ))
+        for lat, lon in unique_cells
+    ))
+
+    # Un único lote de columnas con todas las horas necesarias de todas las celdas
+    batch: Dict[str, List] = {"time": []}
+    for name in METRIC_COLUMNS:
+        batch[name] = []
+    row_cells: List[Cell] = []
+    for cell, (weather_data, marine_data, _) in zip(unique_cells, forecasts):
+        if "hourly" not in weather_data:
+            continue
+        columns = select_hours(
+            weather_data["hourly"], marine_data.get("hourly") if marine_data else None, list(needed[cell])
+        )
+        for name, values in columns.items():
+            batch[name].extend(values)
+        row_cells.extend([cell] * len(columns["time"]))
+
+    scored: Dict[Tuple[Cell, str], Tuple[ScoreResult, bool, List[str]]] = {}
+    if row_cells:
+        [results] = await score(batch, [(request.boat_type, request.skill)])
+        for i, result in enumerate(results):
+            no_go, no_go_reasons = check_no_go(metrics_at(batch, i), request.skill)
+            scored[(row_cells[i], batch["time"][i])] = (result, no_go, no_go_reasons)
+
+    plans = [_plan(departure, positions, cells, scored) for departure in departures]
+    complete = [plan for plan in plans if plan.complete]
+
+    return PassageResponse(
+        distance_nm=round(positions[-1][3], 1),
+        duration_hours=round(positions[-1][0], 2),
+        cells=len(unique_cells),
+        requested=plans[0],
+        best=max(complete, key=_rank) if complete else None,
+        departures=[
+            DepartureOption(**plan.model_dump(include=set(DepartureOption.model_fields)))
+            for plan in plans
+        ]
+    )
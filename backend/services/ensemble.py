@@ -0,0 +1,71 @@
+from backend.services.openmeteo import WEATHER_VARIABLES
+from typing import Dict, List, Sequence
+from datetime import datetime, timedelta
+import os
+
+
+ENSEMBLE_URL = os.environ.get("OPENMETEO_ENSEMBLE_URL", "https://ensemble-api.open-meteo.com/v1/ensemble")
+
+# Horizonte máximo que se pide a la API de ensembles
+MAX_ENSEMBLE_DAYS = 16
+
+ENSEMBLE_VARIABLES = WEATHER_VARIABLES
+
+
+async def fetch_ensemble_data(
+    lat: float,
+    lon: float,
+    date: str,
+    timezone: str,
+    days: int = 5,
+    model: str = "icon_seamless",
+    variables: Sequence[str] = ENSEMBLE_VARIABLES
+) -> Dict:
+    """Obtiene todos los miembros de un modelo de la API de ensembles de Open-Meteo"""
+    import httpx  # diferido: httpx solo se carga al hacer la primera petición
+
+    url = ENSEMBLE_URL
+
+    days = max(1, min(days, MAX_ENSEMBLE_DAYS))
+    start_date = datetime.fromisoformat(date)
+    end_date = start_date + timedelta(days=days - 1)
+
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "hourly": ",".join(variables),
+        "models": model,
+        "timezone": timezone,
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d")
+    }
+
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+
+def split_members(hourly: Dict, variables: Sequence[str] = ENSEMBLE_VARIABLES) -> Dict[str, Dict[str, List]]:
+    """
+    Separa un bloque `hourly` de ensemble en un bloque por miembro.
+    Open-Meteo nombra las columnas `<variable>` (control) y `<variable>_memberNN`;
+    solo se devuelven los miembros que tienen todas las variables.
+    """
+    by_length = sorted(variables, key=len, reverse=True)
+    members: Dict[str, Dict[str, List]] = {}
+    for key in hourly:
+        if key == "time":
+            continue
+        for name in by_length:
+            if key == name or key.startswith(name + "_"):
+                member = key[len(name) + 1:] or "control"
+                members.setdefault(member, {})[name] = hourly[key]
+                break
+
+    times = hourly.get("time", [])
+    return {
+        member: {"time": times, **columns}
+        for member, columns in sorted(members.items())
+        if all(name in columns for name in variables)
+    }
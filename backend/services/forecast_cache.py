@@ -0,0 +1,126 @@
+from backend.services.snapshot import Snapshot, pack
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta
+
+
+CACHE_TTL = 600.0
+
+
+class CacheEntry:
+    """
+    Forecast descargado para un rango de días y un conjunto de variables.
+    Los bloques `hourly` se guardan como snapshots float32 en lugar de listas de Python.
+    """
+
+    __slots__ = ("weather", "marine", "start", "days", "weather_vars", "marine_vars", "fetched_at")
+
+    def __init__(
+        self,
+        weather: Dict,
+        marine: Optional[Dict],
+        start: str,
+        days: int,
+        weather_vars: Sequence[str],
+        marine_vars: Sequence[str],
+        fetched_at: float
+    ):
+        self.weather = pack(weather)
+        self.marine = pack(marine)
+        self.start = start
+        self.days = days
+        self.weather_vars: FrozenSet[str] = frozenset(weather_vars)
+        self.marine_vars: FrozenSet[str] = frozenset(marine_vars)
+        self.fetched_at = fetched_at
+
+    def covers(self, start: str, days: int, weather_vars: Sequence[str], marine_vars: Sequence[str]) -> bool:
+        """True si esta entrada contiene el rango y las variables pedidas"""
+        offset = day_offset(self.start, start)
+        return (
+            offset >= 0
+            and offset + days <= self.days
+            and self.weather_vars.issuperset(weather_vars)
+            and self.marine_vars.issuperset(marine_vars)
+        )
+
+
+# Clave por ubicación y zona horaria: todas las fechas, horizontes y perfiles comparten entradas
+CACHE: Dict[str, List[CacheEntry]] = {}
+
+
+def get_location_key(lat: float, lon: float, timezone: str) -> str:
+    return f"{lat:.2f}_{lon:.2f}_{timezone}"
+
+
+def day_offset(start: str, date: str) -> int:
+    """Días entre start y date (ambos YYYY-MM-DD)"""
+    return (datetime.fromisoformat(date) - datetime.fromisoformat(start)).days
+
+
+def slice_hourly(hourly: Dict, date: str, days: int) -> Dict:
+    """Recorta un bloque `hourly` de Open-Meteo a `days` días desde `date`"""
+    times = hourly.get("time", [])
+    first = f"{date}T00:00"
+    end_date = (datetime.fromisoformat(date) + timedelta(days=days)).strftime("%Y-%m-%d")
+    # Las horas vienen ordenadas: se localizan los extremos y se corta cada columna
+    lo = 0
+    while lo < len(times) and times[lo] < first:
+        lo += 1
+    hi = lo
+    while hi < len(times) and times[hi] < end_date:
+        hi += 1
+    return {name: values[lo:hi] for name, values in hourly.items() if isinstance(values, list)}
+
+
+def _trim(data: Optional[Dict], entry: CacheEntry, date: str, days: int) -> Optional[Dict]:
+    if not data or "hourly" not in data:
+        return data
+    if isinstance(data["hourly"], Snapshot):
+        return {**data, "hourly": data["hourly"].days(date, days).hourly()}
+    if entry.start == date and entry.days == days:
+        return data
+    trimmed = dict(data)
+    trimmed["hourly"] = slice_hourly(data["hourly"], date, days)
+    return trimmed
+
+
+def clean_expired_cache():
+    """Limpia entradas expiradas del cache"""
+    now = datetime.now().timestamp()
+    for key in list(CACHE):
+        entries = [entry for entry in CACHE[key] if now - entry.fetched_at < CACHE_TTL]
+        if entries:
+            CACHE[key] = entries
+        else:
+            del CACHE[key]
+
+
+def lookup(
+    key: str,
+    date: str,
+    days: int,
+    weather_vars: Sequence[str],
+    marine_vars: Sequence[str]
+) -> Optional[Tuple[Dict, Optional[Dict], float]]:
+    """
+    Busca una entrada vigente que cubra la petición (aunque sea más amplia)
+    y la devuelve recortada como (weather_data, marine_data, fetched_at).
+    """
+    now = datetime.now().timestamp()
+    for entry in CACHE.get(key, []):
+        if now - entry.fetched_at < CACHE_TTL and entry.covers(date, days, weather_vars, marine_vars):
+            return (
+                _trim(entry.weather, entry, date, days),
+                _trim(entry.marine, entry, date, days),
+                entry.fetched_at
+            )
+    return None
+
+
+def store(key: str, entry: CacheEntry) -> None:
+    """Guarda una entrada descartando las que quedan cubiertas por ella"""
+    entries = [
+        existing for existing in CACHE.get(key, [])
+        if not entry.covers(existing.start, existing.days, existing.weather_vars, existing.marine_vars)
+    ]
+    entries.append(entry)
+    CACHE[key] = entries
@@ -1,11 +1,16 @@
-import httpx
 from typing import List
 from backend.models import GeocodeResult
+import os
+
+
+GEOCODING_URL = os.environ.get("OPENMETEO_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1/search")
 
 
 async def geocode_location(query: str) -> List[GeocodeResult]:
     """Busca ubicaciones usando la API de geocoding de Open-Meteo"""
-    url = "https://geocoding-api.open-meteo.com/v1/search"
+    import httpx  # diferido: httpx solo se carga al hacer la primera petición
+
+    url = GEOCODING_URL
     params = {
         "name": query,
         "count": 5,
@@ -0,0 +1,190 @@
+from backend.models import ScoreRequest, WindowScore, BoatType, SkillLevel
+from backend.scoring.combined import check_no_go
+from backend.utils.serialization import dumps
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from datetime import datetime
+import asyncio
+
+
+# Mensajes pendientes por conexión; un cliente lento pierde actualizaciones en lugar de frenar a los demás
+LIVE_QUEUE_SIZE = 32
+
+# Reintento tras un fallo al refrescar el forecast
+RETRY_DELAY = 30.0
+
+LoadForecast = Callable[[ScoreRequest], Awaitable[Tuple[Dict, Optional[Dict], float]]]
+ScoreWindows = Callable[[ScoreRequest, Dict, Optional[Dict]], Awaitable[List[WindowScore]]]
+
+# time -> (score, label, no_go)
+WindowState = Dict[str, Tuple[int, str, bool]]
+
+Profile = Tuple[BoatType, SkillLevel]
+
+
+def window_state(windows: List[WindowScore], skill: SkillLevel) -> WindowState:
+    """Resume las ventanas en lo que se vigila: score, etiqueta y NO-GO"""
+    return {w.time: (w.score, w.label, check_no_go(w.raw, skill)[0]) for w in windows}
+
+
+def diff_windows(old: WindowState, new: WindowState) -> Tuple[List[Dict], List[str]]:
+    """Ventanas nuevas o con score/NO-GO distinto, y ventanas que han desaparecido"""
+    changes = []
+    for time, (score, label, no_go) in new.items():
+        previous = old.get(time)
+        if previous is None or previous[0] != score or previous[2] != no_go:
+            changes.append({"time": time, "score": score, "label": label, "no_go": no_go})
+    removed = [time for time in old if time not in new]
+    return changes, removed
+
+
+def spot_key(request: ScoreRequest) -> str:
+    return f"{request.lat:.2f}_{request.lon:.2f}_{request.date}_{request.days}_{request.timezone}"
+
+
+def subscription_id(request: ScoreRequest) -> str:
+    return f"{spot_key(request)}_{request.boat_type.value}_{request.skill.value}"
+
+
+class _Channel:
+    """Suscriptores de un perfil barco/nivel en un spot y el último estado enviado"""
+
+    def __init__(self, request: ScoreRequest):
+        self.request = request
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.state: Optional[WindowState] = None
+        # Instante de descarga del forecast con el que se calculó `state`
+        self.fetched_at = 0.0
+
+
+class _Spot:
+    """Forecast compartido por todos los perfiles suscritos a una ubicación/fecha/horizonte"""
+
+    def __init__(self, request: ScoreRequest):
+        self.request = request
+        self.channels: Dict[Profile, _Channel] = {}
+        self.fetched_at = 0.0
+        self.task: Optional[asyncio.Task] = None
+        self.lock = asyncio.Lock()
+
+
+class LiveHub:
+    """
+    Reparte actualizaciones de forecast a conexiones WebSocket.
+    Hay una única tarea de refresco por spot: descarga una vez, puntúa cada perfil suscrito
+    y difunde el mismo mensaje ya serializado a todas sus colas.
+    """
+
+    def __init__(self, load: LoadForecast, score: ScoreWindows, interval: float):
+        self._load = load
+        self._score = score
+        self.interval = interval
+        self._spots: Dict[str, _Spot] = {}
+
+    async def subscribe(self, queue: asyncio.Queue, request: ScoreRequest) -> str:
+        """Suscribe la cola al perfil y le envía el estado actual como snapshot"""
+        key = spot_key(request)
+        spot = self._spots.get(key)
+        if spot is None:
+            spot = self._spots[key] = _Spot(request)
+
+        profile = (request.boat_type, request.skill)
+        channel = spot.channels.get(profile)
+        if channel is None:
+            channel = spot.channels[profile] = _Channel(request)
+        channel.subscribers.add(queue)
+
+        try:
+            async with spot.lock:
+                if channel.state is None:
+                    weather_data, marine_data, fetched_at = await self._load(request)
+                    windows = await self._score(request, weather_data, marine_data)
+                    channel.state = window_state(windows, request.skill)
+                    channel.fetched_at = fetched_at
+                    # Si la descarga es más nueva que la de los otros perfiles, se les difunde ya
+                    await self._publish(spot, weather_data, marine_data, fetched_at)
+        except Exception:
+            self.unsubscribe(queue, subscription_id(request))
+            raise
+
+        if spot.task is None:
+            spot.task = asyncio.create_task(self._refresh_loop(key, spot))
+
+        self._send(queue, {
+            "type": "snapshot",
+            "subscription": subscription_id(request),
+            "fetched_at": channel.fetched_at,
+            "windows": [
+                {"time": time, "score": score, "label": label, "no_go": no_go}
+                for time, (score, label, no_go) in channel.state.items()
+            ]
+        })
+        return subscription_id(request)
+
+    def unsubscribe(self, queue: asyncio.Queue, subscription: str) -> None:
+        for key, spot in list(self._spots.items()):
+            for profile, channel in list(spot.channels.items()):
+                if subscription_id(channel.request) != subscription:
+                    continue
+                channel.subscribers.discard(queue)
+                if not channel.subscribers:
+                    del spot.channels[profile]
+            if not spot.channels:
+                if spot.task is not None:
+                    spot.task.cancel()
+                del self._spots[key]
+
+    async def close(self) -> None:
+        tasks = [spot.task for spot in self._spots.values() if spot.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._spots.clear()
+
+    def _send(self, queue: asyncio.Queue, message) -> None:
+        text = message if isinstance(message, str) else dumps(message).decode("utf-8")
+        try:
+            queue.put_nowait(text)
+        except asyncio.QueueFull:
+            pass
+
+    async def _refresh_loop(self, key: str, spot: _Spot) -> None:
+        while spot.channels:
+            delay = spot.fetched_at + self.interval - datetime.now().timestamp()
+            await asyncio.sleep(max(1.0, delay + 0.5))
+            try:
+                await self.refresh(spot)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await asyncio.sleep(RETRY_DELAY)
+
+    async def refresh(self, spot: _Spot) -> None:
+        """Descarga el forecast del spot una vez y difunde los cambios de cada perfil"""
+        weather_data, marine_data, fetched_at = await self._load(spot.request)
+        async with spot.lock:
+            await self._publish(spot, weather_data, marine_data, fetched_at)
+
+    async def _publish(self, spot: _Spot, weather_data: Dict, marine_data: Optional[Dict], fetched_at: float) -> None:
+        """Puntúa los perfiles con un forecast más antiguo que `fetched_at` y difunde sus cambios"""
+        spot.fetched_at = max(spot.fetched_at, fetched_at)
+        for channel in list(spot.channels.values()):
+            # Los perfiles que aún no tienen estado están suscribiéndose y cargan su propio forecast
+            if channel.state is None or channel.fetched_at >= fetched_at:
+                continue
+            windows = await self._score(channel.request, weather_data, marine_data)
+            state = window_state(windows, channel.request.skill)
+            changes, removed = diff_windows(channel.state, state)
+            channel.state = state
+            channel.fetched_at = fetched_at
+            if not changes and not removed:
+                continue
+            # Se serializa una vez y se reparte el mismo texto a todos los suscriptores
+            text = dumps({
+                "type": "update",
+                "subscription": subscription_id(channel.request),
+                "fetched_at": fetched_at,
+                "changes": changes,
+                "removed": removed
+            }).decode("utf-8")
+            for queue in list(channel.subscribers):
+                self._send(queue, text)
@@ -1,19 +1,37 @@
-import httpx
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
 from datetime import datetime, timedelta
+import os
 
 
-async def fetch_marine_data(lat: float, lon: float, date: str, timezone: str, days: int = 5) -> Optional[Dict]:
-    """Obtiene datos marinos de Open-Meteo Marine API"""
-    url = "https://marine-api.open-meteo.com/v1/marine"
+MARINE_URL = os.environ.get("OPENMETEO_MARINE_URL", "https://marine-api.open-meteo.com/v1/marine")
+
+# Horizonte máximo de la API marina; más allá las ventanas quedan sin datos de mar
+MAX_MARINE_DAYS = 8
+
+MARINE_VARIABLES = ("wave_height", "wave_direction", "wave_period")
+
+
+async def fetch_marine_data(
+    lat: float,
+    lon: float,
+    date: str,
+    timezone: str,
+    days: int = 5,
+    variables: Sequence[str] = MARINE_VARIABLES
+) -> Optional[Dict]:
+    """Obtiene datos marinos de Open-Meteo Marine API para `days` días desde `date`"""
+    import httpx  # diferido: httpx solo se carga al hacer la primera petición
+
+    url = MARINE_URL
     
+    days = max(1, min(days, MAX_MARINE_DAYS))
     start_date = datetime.fromisoformat(date)
     end_date = start_date + timedelta(days=days - 1)
     
     params = {
         "latitude": lat,
         "longitude": lon,
-        "hourly": "wave_height,wave_direction,wave_period",
+        "hourly": ",".join(variables),
         "timezone": timezone,
         "start_date": start_date.strftime("%Y-%m-%d"),
         "end_date": end_date.strftime("%Y-%m-%d")
@@ -1,19 +1,40 @@
-import httpx
-from typing import Dict, List
+from typing import Dict, List, Sequence
 from datetime import datetime, timedelta
+import os
 
 
-async def fetch_weather_data(lat: float, lon: float, date: str, timezone: str, days: int = 5) -> Dict:
-    """Obtiene datos de forecast de Open-Meteo"""
-    url = "https://api.open-meteo.com/v1/forecast"
+# Se puede apuntar a un servidor local (p. ej. backend.tools.mock_upstream) para pruebas de carga
+FORECAST_URL = os.environ.get("OPENMETEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+
+# Horizonte máximo que ofrece la API de forecast
+MAX_FORECAST_DAYS = 16
+
+WEATHER_VARIABLES = (
+    "windspeed_10m", "windgusts_10m", "temperature_2m", "precipitation", "winddirection_10m"
+)
+
+
+async def fetch_weather_data(
+    lat: float,
+    lon: float,
+    date: str,
+    timezone: str,
+    days: int = 5,
+    variables: Sequence[str] = WEATHER_VARIABLES
+) -> Dict:
+    """Obtiene datos de forecast de Open-Meteo para `days` días desde `date` y solo las variables pedidas"""
+    import httpx  # diferido: httpx solo se carga al hacer la primera petición
+
+    url = FORECAST_URL
     
+    days = max(1, min(days, MAX_FORECAST_DAYS))
     start_date = datetime.fromisoformat(date)
     end_date = start_date + timedelta(days=days - 1)
     
     params = {
         "latitude": lat,
         "longitude": lon,
-        "hourly": "windspeed_10m,windgusts_10m,temperature_2m,precipitation,winddirection_10m",
+        "hourly": ",".join(variables),
         "timezone": timezone,
         "start_date": start_date.strftime("%Y-%m-%d"),
         "end_date": end_date.strftime("%Y-%m-%d")
@@ -0,0 +1,299 @@
+from backend.services.openmeteo import fetch_weather_data, WEATHER_VARIABLES, MAX_FORECAST_DAYS
+from backend.services.marine import fetch_marine_data, MARINE_VARIABLES, MAX_MARINE_DAYS
+from backend.services.ensemble import fetch_ensemble_data, ENSEMBLE_VARIABLES, MAX_ENSEMBLE_DAYS
+from typing import Dict, List, Optional, Sequence
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+import asyncio
+import json
+import math
+import os
+import random
+import time
+
+
+class ForecastProvider(ABC):
+    """
+    Origen de datos horarios con el formato de respuesta de Open-Meteo.
+    Las subclases implementan _fetch_weather/_fetch_marine/_fetch_ensemble; aquí se cuentan llamadas y tiempo.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.calls = 0
+        self.elapsed = 0.0
+
+    async def fetch_weather(
+        self, lat: float, lon: float, date: str, timezone: str,
+        days: int = 5, variables: Sequence[str] = WEATHER_VARIABLES
+    ) -> Dict:
+        start = time.perf_counter()
+        try:
+            return await self._fetch_weather(lat, lon, date, timezone, days, variables)
+        finally:
+            self.calls += 1
+            self.elapsed += time.perf_counter() - start
+
+    async def fetch_marine(
+        self, lat: float, lon: float, date: str, timezone: str,
+        days: int = 5, variables: Sequence[str] = MARINE_VARIABLES
+    ) -> Optional[Dict]:
+        start = time.perf_counter()
+        try:
+            return await self._fetch_marine(lat, lon, date, timezone, days, variables)
+        finally:
+            self.calls += 1
+            self.elapsed += time.perf_counter() - start
+
+    async def fetch_ensemble(
+        self, lat: float, lon: float, date: str, timezone: str,
+        days: int = 5, model: str = "icon_seamless", variables: Sequence[str] = ENSEMBLE_VARIABLES
+    ) -> Dict:
+        start = time.perf_counter()
+        try:
+            return await self._fetch_ensemble(lat, lon, date, timezone, days, model, variables)
+        finally:
+            self.calls += 1
+            self.elapsed += time.perf_counter() - start
+
+    @abstractmethod
+    async def _fetch_weather(self, lat, lon, date, timezone, days, variables) -> Dict:
+        ...
+
+    @abstractmethod
+    async def _fetch_marine(self, lat, lon, date, timezone, days, variables) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    async def _fetch_ensemble(self, lat, lon, date, timezone, days, model, variables) -> Dict:
+        ...
+
+    def stats(self) -> Dict:
+        return {
+            "provider": self.name,
+            "calls": self.calls,
+            "mean_ms": round(1000 * self.elapsed / self.calls, 2) if self.calls else 0.0
+        }
+
+
+class OpenMeteoProvider(ForecastProvider):
+    """APIs reales de Open-Meteo (forecast, marine y ensembles)"""
+
+    name = "openmeteo"
+
+    async def _fetch_weather(self, lat, lon, date, timezone, days, variables):
+        return await fetch_weather_data(lat, lon, date, timezone, days, variables)
+
+    async def _fetch_marine(self, lat, lon, date, timezone, days, variables):
+        return await fetch_marine_data(lat, lon, date, timezone, days, variables)
+
+    async def _fetch_ensemble(self, lat, lon, date, timezone, days, model, variables):
+        return await fetch_ensemble_data(lat, lon, date, timezone, days, model, variables)
+
+
+def hourly_times(date: str, hours: int) -> List[str]:
+    start = datetime.fromisoformat(date)
+    return [(start + timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M") for h in range(hours)]
+
+
+def recording_key(lat: float, lon: float) -> str:
+    return f"{lat:.2f}_{lon:.2f}"
+
+
+class ReplayProvider(ForecastProvider):
+    """
+    Sirve respuestas grabadas desde disco (weather_<lat>_<lon>.json / marine_<lat>_<lon>.json /
+    ensemble_<modelo>_<lat>_<lon>.json, o weather.json / marine.json / ensemble_<modelo>.json
+    como comodín) con una latencia simulada.
+    Las horas se reetiquetan a partir de la fecha pedida para que el resto del flujo no note la diferencia.
+    """
+
+    name = "replay"
+
+    def __init__(self, directory: str, latency_ms: float = 0.0):
+        super().__init__()
+        self.directory = directory
+        self.latency_ms = latency_ms
+        self._loaded: Dict[str, Optional[Dict]] = {}
+
+    def _load(self, kind: str, lat: float, lon: float) -> Optional[Dict]:
+        for filename in (f"{kind}_{recording_key(lat, lon)}.json", f"{kind}.json"):
+            if filename not in self._loaded:
+                path = os.path.join(self.directory, filename)
+                if os.path.exists(path):
+                    with open(path) as f:
+                        self._loaded[filename] = json.load(f)
+                else:
+                    self._loaded[filename] = None
+            if self._loaded[filename] is not None:
+                return self._loaded[filename]
+        return None
+
+    async def _replay(self, kind: str, lat, lon, date, days, variables) -> Optional[Dict]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        recorded = self._load(kind, lat, lon)
+        if recorded is None or "hourly" not in recorded:
+            return None
+        hours = min(len(recorded["hourly"].get("time", [])), days * 24)
+        hourly = {"time": hourly_times(date, hours)}
+        for name in variables:
+            hourly[name] = recorded["hourly"].get(name, [None] * hours)[:hours]
+            if kind.startswith("ensemble"):
+                # Columnas de los miembros: <variable>_memberNN
+                for key, values in recorded["hourly"].items():
+                    if key.startswith(name + "_member"):
+                        hourly[key] = values[:hours]
+        return {**recorded, "latitude": lat, "longitude": lon, "hourly": hourly}
+
+    async def _fetch_weather(self, lat, lon, date, timezone, days, variables):
+        data = await self._replay("weather", lat, lon, date, min(days, MAX_FORECAST_DAYS), variables)
+        if data is None:
+            raise FileNotFoundError(f"Sin grabación meteorológica en {self.directory}")
+        return data
+
+    async def _fetch_marine(self, lat, lon, date, timezone, days, variables):
+        return await self._replay("marine", lat, lon, date, min(days, MAX_MARINE_DAYS), variables)
+
+    async def _fetch_ensemble(self, lat, lon, date, timezone, days, model, variables):
+        data = await self._replay(f"ensemble_{model}", lat, lon, date, min(days, MAX_ENSEMBLE_DAYS), variables)
+        if data is None:
+            raise FileNotFoundError(f"Sin grabación de ensemble {model} en {self.directory}")
+        return data
+
+
+class SyntheticProvider(ForecastProvider):
+    """
+    Genera series plausibles y deterministas (misma ubicación y fecha -> mismos datos)
+    con ciclo diurno de viento y temperatura. Útil para pruebas de carga sin red.
+    Los ensembles son la serie determinista más `members` perturbaciones.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, latency_ms: float = 0.0, seed: int = 0, members: int = 20):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.seed = seed
+        self.members = members
+
+    def _rng(self, kind: str, lat: float, lon: float, date: str) -> random.Random:
+        return random.Random(f"{self.seed}:{kind}:{recording_key(lat, lon)}:{date}")
+
+    async def _fetch_weather(self, lat, lon, date, timezone, days, variables):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        rng = self._rng("weather", lat, lon, date)
+        hours = min(days, MAX_FORECAST_DAYS) * 24
+        base_wind = rng.uniform(8.0, 30.0)
+        base_temp = rng.uniform(8.0, 28.0)
+        base_dir = rng.uniform(0.0, 360.0)
+
+        series = {name: [] for name in WEATHER_VARIABLES}
+        for h in range(hours):
+            diurnal = math.sin((h % 24 - 9) / 24 * 2 * math.pi)
+            wind = max(0.0, base_wind * (1 + 0.4 * diurnal) + rng.gauss(0, 3))
+            series["windspeed_10m"].append(round(wind, 1))
+            series["windgusts_10m"].append(round(wind * rng.uniform(1.1, 1.7), 1))
+            series["temperature_2m"].append(round(base_temp + 5 * diurnal + rng.gauss(0, 1), 1))
+            series["precipitation"].append(round(max(0.0, rng.gauss(-1.5, 1.5)), 1))
+            series["winddirection_10m"].append(round((base_dir + rng.gauss(0, 20)) % 360))
+
+        hourly = {"time": hourly_times(date, hours)}
+        for name in variables:
+            hourly[name] = series.get(name, [None] * hours)
+        return {"latitude": lat, "longitude": lon, "timezone": timezone, "hourly": hourly}
+
+    async def _fetch_marine(self, lat, lon, date, timezone, days, variables):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        rng = self._rng("marine", lat, lon, date)
+        hours = min(days, MAX_MARINE_DAYS) * 24
+        base_hs = rng.uniform(0.2, 2.5)
+        base_dir = rng.uniform(0.0, 360.0)
+
+        series = {name: [] for name in MARINE_VARIABLES}
+        for h in range(hours):
+            series["wave_height"].append(round(max(0.05, base_hs + rng.gauss(0, 0.15)), 2))
+            series["wave_direction"].append(round((base_dir + rng.gauss(0, 10)) % 360))
+            series["wave_period"].append(round(rng.uniform(4.0, 10.0), 1))
+
+        hourly = {"time": hourly_times(date, hours)}
+        for name in variables:
+            hourly[name] = series.get(name, [None] * hours)
+        return {"latitude": lat, "longitude": lon, "timezone": timezone, "hourly": hourly}
+
+    async def _fetch_ensemble(self, lat, lon, date, timezone, days, model, variables):
+        control = await self._fetch_weather(lat, lon, date, timezone, min(days, MAX_ENSEMBLE_DAYS), variables)
+        hourly = dict(control["hourly"])
+        for member in range(1, self.members + 1):
+            rng = self._rng(f"ensemble:{model}:{member}", lat, lon, date)
+            wind_factor = rng.gauss(1.0, 0.2)
+            temp_offset = rng.gauss(0.0, 1.5)
+            suffix = f"_member{member:02d}"
+            for name in variables:
+                values = control["hourly"][name]
+                if name in ("windspeed_10m", "windgusts_10m"):
+                    values = [round(max(0.0, v * wind_factor + rng.gauss(0, 1.5)), 1) for v in values]
+                elif name == "temperature_2m":
+                    values = [round(v + temp_offset, 1) for v in values]
+                elif name == "precipitation":
+                    values = [round(max(0.0, v + rng.gauss(0, 0.3)), 1) for v in values]
+                hourly[name + suffix] = values
+        return {**control, "hourly": hourly}
+
+
+class RecordingProvider(ForecastProvider):
+    """Envuelve otro proveedor y guarda sus respuestas en el formato que lee ReplayProvider"""
+
+    def __init__(self, inner: ForecastProvider, directory: str):
+        super().__init__()
+        self.inner = inner
+        self.directory = directory
+        self.name = f"recording:{inner.name}"
+        os.makedirs(directory, exist_ok=True)
+
+    def _save(self, kind: str, lat: float, lon: float, data: Optional[Dict]) -> None:
+        if data is not None:
+            with open(os.path.join(self.directory, f"{kind}_{recording_key(lat, lon)}.json"), "w") as f:
+                json.dump(data, f)
+
+    async def _fetch_weather(self, lat, lon, date, timezone, days, variables):
+        data = await self.inner.fetch_weather(lat, lon, date, timezone, days, variables)
+        self._save("weather", lat, lon, data)
+        return data
+
+    async def _fetch_marine(self, lat, lon, date, timezone, days, variables):
+        data = await self.inner.fetch_marine(lat, lon, date, timezone, days, variables)
+        self._save("marine", lat, lon, data)
+        return data
+
+    async def _fetch_ensemble(self, lat, lon, date, timezone, days, model, variables):
+        data = await self.inner.fetch_ensemble(lat, lon, date, timezone, days, model, variables)
+        self._save(f"ensemble_{model}", lat, lon, data)
+        return data
+
+
+def provider_from_env() -> ForecastProvider:
+    """
+    Construye el proveedor según FORECAST_PROVIDER (openmeteo | replay | synthetic).
+    FORECAST_REPLAY_DIR indica las grabaciones, FORECAST_LATENCY_MS la latencia simulada
+    y FORECAST_RECORD_DIR, si existe, graba todas las respuestas.
+    """
+    kind = os.environ.get("FORECAST_PROVIDER", "openmeteo")
+    latency_ms = float(os.environ.get("FORECAST_LATENCY_MS", "0"))
+
+    if kind == "openmeteo":
+        provider: ForecastProvider = OpenMeteoProvider()
+    elif kind == "replay":
+        provider = ReplayProvider(os.environ.get("FORECAST_REPLAY_DIR", "recordings"), latency_ms)
+    elif kind == "synthetic":
+        provider = SyntheticProvider(latency_ms)
+    else:
+        raise ValueError(f"FORECAST_PROVIDER desconocido: {kind}")
+
+    record_dir = os.environ.get("FORECAST_RECORD_DIR")
+    if record_dir:
+        provider = RecordingProvider(provider, record_dir)
+    return provider
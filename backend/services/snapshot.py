@@ -0,0 +1,224 @@
+from array import array
+from collections.abc import Mapping, Sequence as SequenceABC
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+import struct
+import sys
+
+
+# Formato binario: cabecera, nombres de variable y columnas float32 little-endian (NaN = sin dato)
+SNAPSHOT_MAGIC = b"SDS1"
+_HEADER = struct.Struct("<4siqIHH")
+
+_EPOCH = datetime(1970, 1, 1)
+_NAN = float("nan")
+
+
+def to_minutes(time: str) -> int:
+    """Minutos desde 1970 de una hora local ISO (sin zona), comparables entre sí"""
+    return int((datetime.fromisoformat(time) - _EPOCH).total_seconds() // 60)
+
+
+def from_minutes(minutes: int) -> str:
+    return (_EPOCH + timedelta(minutes=minutes)).isoformat(timespec="minutes")
+
+
+def _decode(value: float) -> Optional[float]:
+    """float32 -> float con el decimal original (7 cifras significativas); NaN -> None"""
+    if value != value:
+        return None
+    return float(f"{value:.7g}")
+
+
+class Snapshot:
+    """
+    Serie horaria compacta: hora inicial + paso y una columna float32 por variable.
+    Las columnas comparten un único buffer; recortar una ventana o leer un snapshot
+    serializado no copia datos.
+    """
+
+    __slots__ = ("start", "step", "count", "names", "_data", "_stride", "_first", "_index")
+
+    def __init__(self, start: int, step: int, names: Sequence[str], data: memoryview, stride: int, first: int = 0, count: Optional[int] = None):
+        self.start = start
+        self.step = step
+        self.names = tuple(names)
+        self._data = data
+        self._stride = stride
+        self._first = first
+        self.count = stride - first if count is None else count
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_hourly(cls, hourly: Dict) -> "Snapshot":
+        """Empaqueta un bloque `hourly` de Open-Meteo; exige horas con paso constante"""
+        times = hourly.get("time", [])
+        if not times:
+            raise ValueError("Serie horaria vacía")
+        start = to_minutes(times[0])
+        step = to_minutes(times[1]) - start if len(times) > 1 else 60
+        if step <= 0 or any(to_minutes(time) != start + i * step for i, time in enumerate(times)):
+            raise ValueError("Serie horaria con paso irregular")
+
+        count = len(times)
+        names = [name for name, values in hourly.items() if name != "time" and isinstance(values, list)]
+        data = array("f")
+        for name in names:
+            values = hourly[name]
+            data.extend(_NAN if value is None else value for value in values[:count])
+            if len(values) < count:
+                data.extend([_NAN] * (count - len(values)))
+        return cls(start, step, names, memoryview(data), count)
+
+    @classmethod
+    def from_bytes(cls, payload) -> "Snapshot":
+        """Lee un snapshot serializado sin copiar las columnas (en máquinas little-endian)"""
+        view = memoryview(payload)
+        magic, step, start, count, n_names, names_len = _HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("No es un snapshot de forecast")
+        offset = _HEADER.size
+        names = bytes(view[offset:offset + names_len]).decode("utf-8").split("\n") if n_names else []
+        offset += names_len + (-names_len % 4)
+
+        columns = view[offset:offset + n_names * count * 4]
+        if sys.byteorder == "little":
+            data = columns.cast("f")
+        else:
+            swapped = array("f", bytes(columns))
+            swapped.byteswap()
+            data = memoryview(swapped)
+        return cls(start, step, names, data, count)
+
+    def to_bytes(self) -> bytes:
+        names = "\n".join(self.names).encode("utf-8")
+        parts = [
+            _HEADER.pack(SNAPSHOT_MAGIC, self.step, self.start, self.count, len(self.names), len(names)),
+            names,
+            b"\0" * (-len(names) % 4)
+        ]
+        for name in self.names:
+            column = self.column(name)
+            if sys.byteorder == "little":
+                parts.append(column.tobytes())
+            else:
+                swapped = array("f", column)
+                swapped.byteswap()
+                parts.append(swapped.tobytes())
+        return b"".join(parts)
+
+    def __reduce__(self):
+        # Las vistas de memoria no se pueden serializar: al pool de procesos viaja el formato compacto
+        return Snapshot.from_bytes, (self.to_bytes(),)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.names) * self.count * 4
+
+    def column(self, name: str) -> memoryview:
+        """Vista float32 de una variable, sin copia"""
+        offset = self._index[name] * self._stride + self._first
+        return self._data[offset:offset + self.count]
+
+    def window(self, first: int, count: int) -> "Snapshot":
+        """Filas [first, first + count) compartiendo el mismo buffer"""
+        first = max(0, min(first, self.count))
+        count = max(0, min(count, self.count - first))
+        return Snapshot(
+            self.start + first * self.step, self.step, self.names,
+            self._data, self._stride, self._first + first, count
+        )
+
+    def days(self, date: str, days: int) -> "Snapshot":
+        """Ventana de `days` días desde `date` (YYYY-MM-DD), como slice_hourly"""
+        lo = to_minutes(f"{date}T00:00") - self.start
+        hi = lo + days * 1440
+        first = max(0, -(-lo // self.step))
+        last = max(first, -(-hi // self.step))
+        return self.window(first, last - first)
+
+    def hourly(self) -> "HourlyView":
+        return HourlyView(self)
+
+    def to_hourly(self) -> Dict[str, List]:
+        """Bloque `hourly` con listas de Python, como lo devuelve Open-Meteo"""
+        hourly: Dict[str, List] = {"time": list(_TimeColumn(self.start, self.step, self.count))}
+        for name in self.names:
+            hourly[name] = [_decode(value) for value in self.column(name).tolist()]
+        return hourly
+
+
+class _Column(SequenceABC):
+    """Columna que decodifica cada valor al leerlo"""
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: memoryview):
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, i):
+        value = self._values[i]
+        if isinstance(value, float):
+            # _decode en línea: es el acceso más frecuente al muestrear
+            return None if value != value else float(f"{value:.7g}")
+        return [_decode(v) for v in value.tolist()]
+
+
+class _TimeColumn(SequenceABC):
+    """Horas ISO calculadas a partir de inicio y paso"""
+
+    __slots__ = ("_start", "_step", "_count")
+
+    def __init__(self, start: int, step: int, count: int):
+        self._start = start
+        self._step = step
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return from_minutes(self._start + i * self._step)
+
+
+class HourlyView(Mapping):
+    """Vista de solo lectura de un snapshot con la forma de un bloque `hourly` de Open-Meteo"""
+
+    __slots__ = ("snapshot",)
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+
+    def __getitem__(self, name: str):
+        if name == "time":
+            return _TimeColumn(self.snapshot.start, self.snapshot.step, self.snapshot.count)
+        if name not in self.snapshot._index:
+            raise KeyError(name)
+        return _Column(self.snapshot.column(name))
+
+    def __iter__(self):
+        yield "time"
+        yield from self.snapshot.names
+
+    def __len__(self) -> int:
+        return len(self.snapshot.names) + 1
+
+
+def pack(data: Optional[Dict]) -> Optional[Dict]:
+    """Sustituye el bloque `hourly` de una respuesta por su snapshot; si no es regular se deja igual"""
+    if not data or not isinstance(data.get("hourly"), dict):
+        return data
+    try:
+        snapshot = Snapshot.from_hourly(data["hourly"])
+    except (ValueError, TypeError):
+        return data
+    return {**data, "hourly": snapshot}
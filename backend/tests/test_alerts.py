@@ -0,0 +1,156 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.models import AlertRuleRequest, BoatType, SkillLevel
+from backend.alerts.rules import AlertEngine
+from backend.alerts.sinks import OutboxSink
+
+
+PROFILE = (BoatType.VELERO_MEDIO, SkillLevel.INTERMEDIO)
+TIMES = ["2025-09-30T09:00", "2025-09-30T12:00", "2025-09-30T15:00", "2025-09-30T18:00"]
+
+
+def series(scores, no_go=None):
+    return {PROFILE: (scores, no_go or [False] * len(scores))}
+
+
+class TestAlertEngine:
+    def test_score_above_fires_once(self):
+        engine = AlertEngine()
+        rule_id = engine.add_rule(41.3, 2.1, "velero_medio", "intermedio", "score_above", threshold=70)
+
+        assert engine.evaluate(41.3, 2.1, TIMES, series([40, 50, 60, 55])) == []
+        fired = engine.evaluate(41.3, 2.1, TIMES, series([40, 80, 75, 55]))
+        assert len(fired) == 1
+        assert fired[0]["rule"]["id"] == rule_id
+        assert (fired[0]["time"], fired[0]["score"]) == ("2025-09-30T12:00", 80)
+        # Sigue cumpliéndose: no se repite el aviso
+        assert engine.evaluate(41.3, 2.1, TIMES, series([40, 85, 75, 55])) == []
+
+    def test_time_range(self):
+        engine = AlertEngine()
+        engine.add_rule(
+            41.3, 2.1, "velero_medio", "intermedio", "score_above", threshold=70,
+            start="2025-09-30T14:00", end="2025-09-30T20:00"
+        )
+        assert engine.evaluate(41.3, 2.1, TIMES, series([90, 90, 60, 60])) == []
+        fired = engine.evaluate(41.3, 2.1, TIMES, series([90, 90, 60, 72]))
+        assert fired[0]["time"] == "2025-09-30T18:00"
+
+    def test_rule_times_must_be_local(self):
+        rule = {"lat": 41.3, "lon": 2.1, "boat_type": "velero_medio", "skill": "intermedio"}
+        assert AlertRuleRequest(**rule, start="2025-09-30T14:00").start == "2025-09-30T14:00"
+        with pytest.raises(ValidationError):
+            AlertRuleRequest(**rule, start="2025-09-30T14:00+02:00")
+        with pytest.raises(ValidationError):
+            AlertRuleRequest(**rule, end="mañana")
+
+    def test_no_go_clears(self):
+        engine = AlertEngine()
+        engine.add_rule(41.3, 2.1, "velero_medio", "intermedio", "no_go_clears")
+        assert engine.evaluate(41.3, 2.1, TIMES, series([40, 50, 60, 55])) == []
+        assert engine.evaluate(41.3, 2.1, TIMES, series([40, 50, 60, 55], [False, True, False, False])) == []
+        fired = engine.evaluate(41.3, 2.1, TIMES, series([40, 50, 60, 55]))
+        assert len(fired) == 1
+        assert fired[0]["score"] == 60
+
+    def test_index_by_cell_and_profile(self):
+        engine = AlertEngine()
+        rule_id = engine.add_rule(41.301, 2.101, "velero_medio", "intermedio", "score_above")
+        engine.add_rule(43.0, -8.0, "dinghy", "avanzado", "score_above")
+        assert engine.profiles_for_cell(41.30, 2.10) == [PROFILE]
+        assert engine.profiles_for_cell(40.0, 2.1) == []
+
+        assert engine.remove_rule(rule_id)
+        assert not engine.remove_rule(rule_id)
+        assert engine.profiles_for_cell(41.30, 2.10) == []
+        assert len(engine.cells()) == 1
+
+    def test_persistence(self, tmp_path):
+        path = str(tmp_path / "rules.jsonl")
+        engine = AlertEngine(path)
+        rule_id = engine.add_rule(41.3, 2.1, "velero_medio", "intermedio", "score_above", contact="a@b.es")
+        reloaded = AlertEngine(path)
+        assert reloaded.get_rule(rule_id) == engine.get_rule(rule_id)
+
+    def test_persistence_appends_and_tombstones(self, tmp_path):
+        path = tmp_path / "rules.jsonl"
+        engine = AlertEngine(str(path))
+        kept = engine.add_rule(41.3, 2.1, "velero_medio", "intermedio", "score_above")
+        removed = engine.add_rule(41.3, 2.1, "dinghy", "avanzado", "no_go_clears")
+        engine.remove_rule(removed)
+        assert len(path.read_text().splitlines()) == 3
+
+        reloaded = AlertEngine(str(path))
+        assert len(reloaded) == 1
+        assert reloaded.get_rule(kept) is not None
+        assert reloaded.get_rule(removed) is None
+
+    def test_workers_share_log(self, tmp_path):
+        path = str(tmp_path / "rules.jsonl")
+        first, second = AlertEngine(path), AlertEngine(path)
+        rule_id = first.add_rule(41.3, 2.1, "velero_medio", "intermedio", "score_above", threshold=70)
+        second.sync()
+        assert second.get_rule(rule_id) == first.get_rule(rule_id)
+        assert second.remove_rule(rule_id)
+        first.sync()
+        assert first.get_rule(rule_id) is None
+
+        # Tras compactar, los demás procesos releen el log entero
+        kept = second.add_rule(41.3, 2.1, "dinghy", "avanzado", "no_go_clears")
+        second.save()
+        first.sync()
+        assert len(first) == 1 and first.get_rule(kept) is not None
+
+    def test_single_evaluator(self, tmp_path):
+        path = str(tmp_path / "rules.jsonl")
+        first, second = AlertEngine(path), AlertEngine(path)
+        assert first.is_evaluator()
+        assert not second.is_evaluator()
+        # Al terminar el evaluador se libera el bloqueo y otro proceso lo hereda
+        first._owner.close()
+        assert second.is_evaluator()
+        second._owner.close()
+        assert AlertEngine().is_evaluator()
+
+    def test_state_survives_restart(self, tmp_path):
+        path = str(tmp_path / "rules.jsonl")
+        engine = AlertEngine(path)
+        engine.add_rule(41.3, 2.1, "velero_medio", "intermedio", "score_above", threshold=70)
+        assert len(engine.evaluate(41.3, 2.1, TIMES, series([40, 80, 75, 55]))) == 1
+        assert AlertEngine(path).evaluate(41.3, 2.1, TIMES, series([40, 85, 75, 55])) == []
+
+        compacted = AlertEngine(path)
+        compacted.save()
+        assert AlertEngine(path).evaluate(41.3, 2.1, TIMES, series([40, 85, 75, 55])) == []
+
+    def test_partial_series_leaves_state(self):
+        engine = AlertEngine()
+        engine.add_rule(
+            41.3, 2.1, "velero_medio", "intermedio", "no_go_clears",
+            start="2025-09-30T09:00", end="2025-10-01T09:00"
+        )
+        full = TIMES + ["2025-09-30T21:00", "2025-10-01T00:00", "2025-10-01T03:00", "2025-10-01T06:00"]
+        no_go = [False] * 7 + [True]
+        assert engine.evaluate(41.3, 2.1, full, series([50] * 8, no_go)) == []
+        # Un tramo corto que no llega al final de la regla no la evalúa ni la hace saltar
+        assert engine.evaluate(41.3, 2.1, TIMES, series([50] * 4)) == []
+        assert len(engine.evaluate(41.3, 2.1, full, series([50] * 8))) == 1
+
+
+class TestOutboxSink:
+    def test_appends_json_lines(self, tmp_path):
+        path = tmp_path / "outbox.jsonl"
+        sink = OutboxSink(str(path))
+        asyncio.run(sink.send([{"rule": {"id": "a"}, "score": 80}]))
+        asyncio.run(sink.send([]))
+        asyncio.run(sink.send([{"rule": {"id": "b"}, "score": 90}]))
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["rule"]["id"] for line in lines] == ["a", "b"]
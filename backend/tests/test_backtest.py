@@ -0,0 +1,70 @@
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.models import BoatType, SkillLevel
+from backend.backtest.__main__ import parse_source
+from backend.backtest.sources import read_csv, normalize_name
+from backend.backtest.engine import LocationSource, run_backtest, score_chunk, merge, summarize
+
+
+PROFILE = [(BoatType.VELERO_MEDIO, SkillLevel.INTERMEDIO)]
+
+
+def write_csv(path: Path, days: int, wind_kmh: float = 28.0):
+    start = datetime(2024, 12, 31)
+    lines = [
+        "latitude,longitude,elevation",
+        "41.3,2.1,0",
+        "",
+        "time,wind_speed_10m (km/h),wind_gusts_10m (km/h),temperature_2m (°C),precipitation (mm),"
+        "wind_direction_10m (°),wave_height (m),wave_direction (°),wave_period (s)"
+    ]
+    for h in range(24 * days):
+        t = (start + timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M")
+        lines.append(f"{t},{wind_kmh},{wind_kmh * 1.2},20.0,0.0,90,0.8,270,7.5")
+    path.write_text("\n".join(lines) + "\n")
+
+
+class TestBacktest:
+    def test_normalize_name(self):
+        assert normalize_name("wind_speed_10m (km/h)") == "windspeed_10m"
+        assert normalize_name("wave_height (m)") == "wave_height"
+
+    def test_marine_path_only_for_json(self):
+        assert parse_source("Bcn=w.json,m.json").marine_path == "m.json"
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_source("Palma=palma.csv,palma_marine.csv")
+
+    def test_read_csv_in_chunks(self, tmp_path):
+        path = tmp_path / "spot.csv"
+        write_csv(path, days=3)
+        chunks = list(read_csv(str(path), chunk_hours=48))
+        assert [len(c["time"]) for c in chunks] == [48, 24]
+        assert chunks[0]["windspeed_10m"][0] == 28.0
+        assert chunks[0]["wave_height"][0] == 0.8
+
+    def test_summary_splits_years_and_days(self, tmp_path):
+        path = tmp_path / "spot.csv"
+        write_csv(path, days=3)
+        totals = ({}, {})
+        for chunk in read_csv(str(path), chunk_hours=36):
+            merge(totals, score_chunk(chunk, PROFILE))
+        rows = summarize("Spot", totals)
+        assert [(r["year"], r["days"], r["windows"]) for r in rows] == [(2024, 1, 8), (2025, 2, 16)]
+        # ~15 kn con ola moderada: todos los días navegables para velero medio intermedio
+        assert rows[1]["sailable_days"] == 2
+        assert rows[1]["sailable_hours"] == 48
+
+    def test_run_backtest(self, tmp_path):
+        path = tmp_path / "spot.csv"
+        write_csv(path, days=2, wind_kmh=70.0)
+        rows = run_backtest([LocationSource("Spot", str(path))], PROFILE, workers=1, chunk_hours=24)
+        assert sum(r["windows"] for r in rows) == 16
+        assert all(r["sailable_days"] == 0 for r in rows)
+        assert sum(r["no_go_hours"] for r in rows) == 48
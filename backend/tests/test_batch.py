@@ -0,0 +1,75 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.models import BoatType, SkillLevel, RawMetrics
+from backend.scoring.batch import extract_columns, score_columns, build_windows
+from backend.scoring.combined import calculate_score
+from backend.scoring.executor import ScoringExecutor
+
+
+def make_hourly(hours: int = 24):
+    times = [f"2025-09-30T{h % 24:02d}:00" for h in range(hours)]
+    weather = {
+        "time": times,
+        "windspeed_10m": [10.0 + h for h in range(hours)],
+        "windgusts_10m": [15.0 + h for h in range(hours)],
+        "temperature_2m": [20.0] * hours,
+        "precipitation": [0.0] * hours,
+        "winddirection_10m": [90.0] * hours
+    }
+    marine = {
+        "time": times,
+        "wave_height": [0.5] * hours,
+        "wave_direction": [180.0] * hours,
+        "wave_period": [6.0] * hours
+    }
+    return weather, marine
+
+
+class TestBatchScoring:
+    def test_extract_columns_samples_3h(self):
+        weather, marine = make_hourly()
+        columns = extract_columns(weather, marine)
+        assert len(columns["time"]) == 8
+        assert columns["time"][1] == "2025-09-30T03:00"
+        assert abs(columns["wind_kn"][1] - 13.0 * 0.539957) < 1e-9
+        assert columns["wave_hs_m"][1] == 0.5
+
+    def test_extract_columns_without_marine(self):
+        weather, _ = make_hourly()
+        columns = extract_columns(weather, None)
+        assert columns["wave_hs_m"] == [None] * 8
+
+    def test_score_columns_matches_calculate_score(self):
+        weather, marine = make_hourly()
+        columns = extract_columns(weather, marine)
+        results = score_columns(columns, BoatType.VELERO_MEDIO, SkillLevel.INTERMEDIO)
+        expected = calculate_score(
+            RawMetrics(
+                wind_kn=columns["wind_kn"][2], gust_kn=columns["gust_kn"][2],
+                wave_hs_m=0.5, wave_tp_s=6.0, wave_dir_deg=180.0, wind_dir_deg=90.0,
+                precip_mm_h=0.0, temp_c=20.0
+            ),
+            BoatType.VELERO_MEDIO, SkillLevel.INTERMEDIO
+        )
+        assert results[2] == expected
+        windows = build_windows(columns, results)
+        assert windows[2].score == expected[0]
+        assert windows[2].raw.wave_hs_m == 0.5
+
+    def test_executor_pool_matches_inline(self):
+        weather, marine = make_hourly(72)
+        columns = extract_columns(weather, marine)
+        profiles = [(BoatType.DINGHY, SkillLevel.PRINCIPIANTE), (BoatType.TABLAS, SkillLevel.AVANZADO)]
+        inline = asyncio.run(ScoringExecutor(workers=0).score(columns, profiles))
+
+        executor = ScoringExecutor(workers=1, threshold=1)
+        executor.start()
+        try:
+            pooled = asyncio.run(executor.score(columns, profiles))
+        finally:
+            executor.shutdown()
+        assert pooled == inline
@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.models import SkillLevel, RawMetrics, WindowScore
+from backend.scoring.daily import summarize_days
+
+
+def make_window(time: str, score: int, wind_kn: float = 12.0, reasons=None) -> WindowScore:
+    return WindowScore(
+        time=time,
+        score=score,
+        label="Bueno",
+        reasons=reasons or [f"Viento {wind_kn:.1f} kn en rango óptimo"],
+        flags=[],
+        raw=RawMetrics(wind_kn=wind_kn, gust_kn=wind_kn + 2, wave_hs_m=0.5, precip_mm_h=0.0, temp_c=20.0)
+    )
+
+
+class TestDailySummary:
+    def test_groups_by_day(self):
+        windows = [
+            make_window("2025-09-30T09:00", 40),
+            make_window("2025-09-30T12:00", 70),
+            make_window("2025-10-01T09:00", 50)
+        ]
+        days = summarize_days(windows, SkillLevel.INTERMEDIO)
+        assert [d.date for d in days] == ["2025-09-30", "2025-10-01"]
+        assert days[0].max_score == 70
+        assert days[0].mean_score == 55.0
+        assert days[0].best_window.time == "2025-09-30T12:00"
+        assert days[0].sailable_hours == 3
+        assert days[1].sailable_hours == 3
+
+    def test_no_go_day(self):
+        windows = [
+            make_window("2025-09-30T09:00", 30, wind_kn=30.0),
+            make_window("2025-09-30T12:00", 60)
+        ]
+        [day] = summarize_days(windows, SkillLevel.PRINCIPIANTE)
+        assert day.safety.no_go is True
+        assert len(day.safety.why) > 0
+        assert day.sailable_hours == 3
+
+    def test_dominant_reasons_ignore_values(self):
+        windows = [
+            make_window("2025-09-30T09:00", 60, wind_kn=11.0),
+            make_window("2025-09-30T12:00", 60, wind_kn=13.0),
+            make_window("2025-09-30T15:00", 60, reasons=["Ola 0.5 m favorable"])
+        ]
+        [day] = summarize_days(windows, SkillLevel.INTERMEDIO)
+        assert day.reasons == ["Viento 11.0 kn en rango óptimo", "Ola 0.5 m favorable"]
+
+    def test_empty(self):
+        assert summarize_days([], SkillLevel.INTERMEDIO) == []
+
+    def test_cache_key_includes_timezone(self):
+        from backend.main import get_cache_key
+
+        madrid = get_cache_key(41.3, 2.1, "2025-09-30", "dinghy", "intermedio", 5, "Europe/Madrid")
+        tokyo = get_cache_key(41.3, 2.1, "2025-09-30", "dinghy", "intermedio", 5, "Asia/Tokyo")
+        assert madrid != tokyo
+
+    def test_cached_summary_echoes_request_location(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import main
+        from backend.services.providers import SyntheticProvider
+
+        monkeypatch.setattr(main, "FORECAST_PROVIDER", SyntheticProvider())
+        main.DAILY_CACHE.clear()
+        client = TestClient(main.app)
+        body = {"lon": 2.1, "boat_type": "dinghy", "skill": "intermedio", "date": "2025-09-30", "days": 2}
+        first = client.post("/api/score/daily", json={**body, "lat": 41.3012}).json()
+        second = client.post("/api/score/daily", json={**body, "lat": 41.3049}).json()
+        assert first["location"]["lat"] == 41.3012
+        assert second["location"]["lat"] == 41.3049
+        assert first["days"] == second["days"]
+        main.DAILY_CACHE.clear()
@@ -0,0 +1,93 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.models import BoatType, SkillLevel, EnsembleRequest
+from backend.scoring.ensemble import percentile, member_batch, ensemble_windows
+from backend.scoring.executor import ScoringExecutor
+from backend.services.ensemble import split_members
+from backend.services.providers import SyntheticProvider
+from backend.services.snapshot import Snapshot
+
+
+class TestEnsemble:
+    def test_split_members(self):
+        hourly = {
+            "time": ["t0", "t1"],
+            "windspeed_10m": [10.0, 11.0],
+            "windspeed_10m_member01": [12.0, 13.0],
+            "windgusts_10m": [15.0, 16.0],
+            "windgusts_10m_member01": [17.0, 18.0],
+        }
+        members = split_members(hourly, ("windspeed_10m", "windgusts_10m"))
+        assert list(members) == ["control", "member01"]
+        assert members["member01"]["windgusts_10m"] == [17.0, 18.0]
+        assert members["control"]["time"] == ["t0", "t1"]
+        assert split_members(hourly, ("windspeed_10m", "temperature_2m")) == {}
+
+    def test_percentile(self):
+        assert percentile([10, 20, 30, 40, 50], 50) == 30
+        assert percentile([10, 20], 50) == 15
+        assert percentile([10, 20, 30, 40, 50], 10) == 14
+
+    def test_members_scored_in_one_batch(self):
+        provider = SyntheticProvider(members=10)
+        data = asyncio.run(provider.fetch_ensemble(41.3, 2.1, "2025-09-30", "UTC", 2, "icon_seamless"))
+        # Igual que desde el cache: los miembros se leen de un snapshot
+        hourly = Snapshot.from_hourly(data["hourly"]).hourly()
+        members = split_members(hourly)
+        assert len(members) == 11
+
+        batch, row_members = member_batch(members, None)
+        assert len(batch["time"]) == 11 * 16
+        assert row_members.count("member03") == 16
+
+        forecasts = {"icon_seamless": hourly}
+        count, windows = ensemble_windows(forecasts, None, BoatType.VELERO_MEDIO, SkillLevel.PRINCIPIANTE)
+        assert count == 11
+        assert len(windows) == 16
+        for window in windows:
+            assert window.members == 11
+            assert window.p10 <= window.p50 <= window.p90
+            assert 0.0 <= window.no_go_probability <= 1.0
+
+        # El snapshot viaja al pool en formato compacto y solo vuelve el resumen, con el mismo resultado
+        executor = ScoringExecutor(workers=1, threshold=1)
+        executor.start()
+        try:
+            pooled = asyncio.run(executor.run(
+                len(batch["time"]), ensemble_windows, forecasts, None, BoatType.VELERO_MEDIO, SkillLevel.PRINCIPIANTE
+            ))
+        finally:
+            executor.shutdown()
+        assert pooled == (count, windows)
+
+    def test_model_names_restricted(self):
+        base = {"lat": 41.3, "lon": 2.1, "boat_type": "dinghy", "skill": "intermedio", "date": "2025-09-30"}
+        assert EnsembleRequest(**base, models=["icon_seamless", "gfs025"]).models == ["icon_seamless", "gfs025"]
+        for model in ("../etc/passwd", "icon seamless", "ICON"):
+            with pytest.raises(ValidationError):
+                EnsembleRequest(**base, models=[model])
+
+    def test_etag_follows_marine_fetch(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import main
+        from backend.services import forecast_cache
+
+        monkeypatch.setattr(main, "FORECAST_PROVIDER", SyntheticProvider(members=2))
+        monkeypatch.setattr(forecast_cache, "CACHE", {})
+        client = TestClient(main.app)
+        body = {"lat": 41.3, "lon": 2.1, "boat_type": "dinghy", "skill": "intermedio", "date": "2025-09-30", "days": 1}
+        etag = client.post("/api/score/ensemble", json=body).headers["ETag"]
+        assert client.post("/api/score/ensemble", json=body).headers["ETag"] == etag
+
+        # Una descarga marina más reciente invalida el ETag aunque los modelos sigan en cache
+        key = forecast_cache.get_location_key(41.3, 2.1, "Europe/Madrid")
+        [marine] = forecast_cache.CACHE[key]
+        marine.fetched_at += 1
+        assert client.post("/api/score/ensemble", json=body).headers["ETag"] != etag
@@ -0,0 +1,55 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services import forecast_cache
+from backend.services.forecast_cache import CacheEntry, slice_hourly, lookup, store
+
+
+def make_weather(date: str, days: int):
+    start = datetime.fromisoformat(date)
+    times = [(start + timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M") for h in range(24 * days)]
+    return {"hourly": {"time": times, "windspeed_10m": list(range(len(times)))}}
+
+
+def make_entry(date: str, days: int, weather_vars=("windspeed_10m",), fetched_at=None):
+    return CacheEntry(
+        make_weather(date, days), None, date, days, weather_vars, (),
+        fetched_at if fetched_at is not None else datetime.now().timestamp()
+    )
+
+
+class TestForecastCache:
+    def setup_method(self):
+        forecast_cache.CACHE.clear()
+
+    def test_slice_hourly(self):
+        hourly = make_weather("2025-09-30", 3)["hourly"]
+        sliced = slice_hourly(hourly, "2025-10-01", 1)
+        assert sliced["time"][0] == "2025-10-01T00:00"
+        assert sliced["time"][-1] == "2025-10-01T23:00"
+        assert sliced["windspeed_10m"][0] == 24
+
+    def test_narrower_request_served_from_wider_entry(self):
+        store("k", make_entry("2025-09-30", 5))
+        weather, marine, _ = lookup("k", "2025-10-02", 2, ["windspeed_10m"], [])
+        assert len(weather["hourly"]["time"]) == 48
+        assert weather["hourly"]["time"][0] == "2025-10-02T00:00"
+        assert marine is None
+
+    def test_miss_outside_range_or_variables(self):
+        store("k", make_entry("2025-09-30", 2))
+        assert lookup("k", "2025-10-01", 2, ["windspeed_10m"], []) is None
+        assert lookup("k", "2025-09-29", 1, ["windspeed_10m"], []) is None
+        assert lookup("k", "2025-09-30", 1, ["windspeed_10m", "precipitation"], []) is None
+
+    def test_expired_entry_ignored(self):
+        store("k", make_entry("2025-09-30", 5, fetched_at=0.0))
+        assert lookup("k", "2025-09-30", 1, ["windspeed_10m"], []) is None
+
+    def test_store_drops_covered_entries(self):
+        store("k", make_entry("2025-10-01", 1))
+        store("k", make_entry("2025-09-30", 5))
+        assert len(forecast_cache.CACHE["k"]) == 1
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.utils.http_cache import make_etag, etag_matches, cache_headers
+
+
+class TestHttpCache:
+    def test_etag_depends_on_parts(self):
+        assert make_etag(1000.0, "41.30", "dinghy") == make_etag(1000.0, "41.30", "dinghy")
+        assert make_etag(1000.0, "41.30", "dinghy") != make_etag(1001.0, "41.30", "dinghy")
+        assert make_etag(1000.0).startswith('"')
+
+    def test_etag_matches_list_and_weak(self):
+        etag = make_etag("a")
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
+
+    def test_cache_headers_age(self):
+        headers = cache_headers('"x"', fetched_at=1000.0, ttl=600.0, now=1100.0)
+        assert headers["Age"] == "100"
+        assert headers["Cache-Control"] == "public, max-age=600"
+
+    def test_cache_headers_expired(self):
+        headers = cache_headers('"x"', fetched_at=1000.0, ttl=600.0, now=1700.0)
+        assert headers["Cache-Control"] == "public, max-age=600"
+        assert headers["Age"] == "600"
+
+
+class TestGeocodeCache:
+    def test_lru_cap(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import main
+
+        async def fake_geocode(query):
+            return []
+
+        monkeypatch.setattr(main, "geocode_location", fake_geocode)
+        monkeypatch.setattr(main, "GEOCODE_CACHE_SIZE", 2)
+        main.GEOCODE_CACHE.clear()
+        client = TestClient(main.app)
+        for q in ("palma", "vigo", "palma", "bilbao"):
+            assert client.get("/api/geocode", params={"q": q}).status_code == 200
+        assert list(main.GEOCODE_CACHE) == ["palma", "bilbao"]
+        main.GEOCODE_CACHE.clear()
+
+    def test_conditional_get_and_post(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import main
+        from backend.services.providers import SyntheticProvider
+
+        monkeypatch.setattr(main, "FORECAST_PROVIDER", SyntheticProvider())
+        client = TestClient(main.app)
+        params = {"lat": 41.3012, "lon": 2.1, "boat_type": "dinghy", "skill": "intermedio", "date": "2025-09-30", "days": 1}
+        etag = client.get("/api/score", params=params).headers["ETag"]
+        assert client.get("/api/score", params=params, headers={"If-None-Match": etag}).status_code == 304
+        assert client.post("/api/score", json=params, headers={"If-None-Match": etag}).status_code == 412
+        # Otra latitud con el mismo redondeo devuelve otro cuerpo y otro ETag
+        other = client.get("/api/score", params={**params, "lat": 41.3013}, headers={"If-None-Match": etag})
+        assert other.status_code == 200
+        assert other.headers["ETag"] != etag
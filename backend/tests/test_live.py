@@ -0,0 +1,117 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.models import ScoreRequest, WindowScore, RawMetrics, SkillLevel
+from backend.services.live import LiveHub, diff_windows, window_state
+
+
+def make_window(time: str, score: int, wind_kn: float = 12.0) -> WindowScore:
+    return WindowScore(
+        time=time, score=score, label="Bueno", reasons=[], flags=[],
+        raw=RawMetrics(wind_kn=wind_kn, gust_kn=wind_kn, precip_mm_h=0.0, temp_c=20.0)
+    )
+
+
+def make_request(boat_type: str = "dinghy", skill: str = "intermedio") -> ScoreRequest:
+    return ScoreRequest(lat=41.3, lon=2.1, boat_type=boat_type, skill=skill, date="2025-09-30")
+
+
+class TestLiveUpdates:
+    def test_diff_windows(self):
+        old = {"t0": (50, "Aceptable", False), "t1": (60, "Bueno", False), "t2": (40, "A valorar", False)}
+        new = {"t0": (50, "Aceptable", False), "t1": (65, "Bueno", False), "t3": (70, "Bueno", False)}
+        changes, removed = diff_windows(old, new)
+        assert [c["time"] for c in changes] == ["t1", "t3"]
+        assert removed == ["t2"]
+
+    def test_window_state_no_go(self):
+        state = window_state([make_window("t0", 30, wind_kn=30.0)], SkillLevel.PRINCIPIANTE)
+        assert state["t0"] == (30, "Bueno", True)
+
+    def test_refresh_fans_out_one_fetch(self):
+        fetches = []
+        scores = {"value": 50}
+
+        async def load(request):
+            fetches.append(request)
+            return {}, None, float(len(fetches))
+
+        async def score(request, weather_data, marine_data):
+            return [make_window("2025-09-30T09:00", scores["value"])]
+
+        async def scenario():
+            hub = LiveHub(load, score, interval=600.0)
+            q1, q2, q3 = asyncio.Queue(), asyncio.Queue(), asyncio.Queue()
+            await hub.subscribe(q1, make_request())
+            await hub.subscribe(q2, make_request())
+            await hub.subscribe(q3, make_request("tablas"))
+            assert len(fetches) == 2
+            assert json.loads(q1.get_nowait())["type"] == "snapshot"
+
+            scores["value"] = 70
+            spot = next(iter(hub._spots.values()))
+            await hub.refresh(spot)
+            await hub.close()
+            return fetches, [q1, q2, q3]
+
+        fetches, queues = asyncio.run(scenario())
+        assert len(fetches) == 3
+        q1, q2, q3 = queues
+        update = json.loads(q1.get_nowait())
+        assert update["type"] == "update"
+        assert update["changes"][0]["score"] == 70
+        assert json.loads(q2.get_nowait())["type"] == "snapshot"
+        assert json.loads(q2.get_nowait()) == update
+        q3.get_nowait()
+        assert json.loads(q3.get_nowait())["type"] == "update"
+
+    def test_newer_fetch_on_subscribe_updates_other_profiles(self):
+        fetches = []
+        scores = {"value": 50}
+
+        async def load(request):
+            fetches.append(request)
+            return {}, None, float(len(fetches))
+
+        async def score(request, weather_data, marine_data):
+            return [make_window("2025-09-30T09:00", scores["value"])]
+
+        async def scenario():
+            hub = LiveHub(load, score, interval=600.0)
+            q1, q2 = asyncio.Queue(), asyncio.Queue()
+            await hub.subscribe(q1, make_request())
+            scores["value"] = 70
+            await hub.subscribe(q2, make_request("tablas"))
+            # La siguiente descarga no es más nueva para ningún perfil: no hay mensajes
+            fetches.pop()
+            spot = next(iter(hub._spots.values()))
+            await hub.refresh(spot)
+            await hub.close()
+            return q1, q2
+
+        q1, q2 = asyncio.run(scenario())
+        assert json.loads(q1.get_nowait())["type"] == "snapshot"
+        update = json.loads(q1.get_nowait())
+        assert update["fetched_at"] == 2.0
+        assert update["changes"][0]["score"] == 70
+        assert q1.empty()
+        assert json.loads(q2.get_nowait())["fetched_at"] == 2.0
+        assert q2.empty()
+
+    def test_websocket_survives_invalid_messages(self):
+        from fastapi.testclient import TestClient
+        from backend import main
+
+        client = TestClient(main.app)
+        with client.websocket_connect("/api/ws") as websocket:
+            websocket.send_text("no es json")
+            assert websocket.receive_json()["type"] == "error"
+            websocket.send_text("[1, 2]")
+            assert websocket.receive_json()["type"] == "error"
+            websocket.send_json({"action": "unsubscribe", "subscription": "nada"})
+            websocket.send_json({"action": "otra"})
+            assert websocket.receive_json()["detail"] == "Acción desconocida: otra"
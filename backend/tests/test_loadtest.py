@@ -0,0 +1,76 @@
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services import openmeteo
+from backend.tools.loadtest import TrafficModel, ZipfSampler, make_locations, parse_mix, percentile, summarize
+from backend.tools.mock_upstream import MockUpstream
+
+
+class TestMockUpstream:
+    def test_forecast_via_service(self, monkeypatch):
+        mock = MockUpstream(latency_ms=0, extra_variables=2).start()
+        try:
+            monkeypatch.setattr(openmeteo, "FORECAST_URL", f"{mock.url}/v1/forecast")
+            data = asyncio.run(openmeteo.fetch_weather_data(41.3, 2.1, "2025-09-30", "UTC", 2))
+            assert len(data["hourly"]["time"]) == 48
+            assert "padding_01" in data["hourly"]
+            assert mock.stats() == {"forecast": 1}
+        finally:
+            mock.stop()
+
+    def test_simulated_errors(self):
+        mock = MockUpstream(latency_ms=0, error_rate=1.0).start()
+        try:
+            response = httpx.get(f"{mock.url}/v1/search", params={"name": "Palma"})
+            assert response.status_code == 503
+            assert mock.stats() == {"geocoding": 1, "errors": 1}
+        finally:
+            mock.stop()
+
+
+class TestTraffic:
+    def test_zipf_skews_to_first_ranks(self):
+        sampler = ZipfSampler(100, 1.2, random.Random(1))
+        counts = [0] * 100
+        for _ in range(5000):
+            counts[sampler.sample()] += 1
+        assert counts[0] > counts[9] > counts[99]
+        assert sum(counts[:10]) > 2500
+
+    def test_traffic_is_deterministic(self):
+        def requests(seed):
+            traffic = TrafficModel(make_locations(20, seed), 1.1, parse_mix("score=1,geocode=1"), seed)
+            return [traffic.next() for _ in range(20)]
+
+        assert requests(3) == requests(3)
+
+    def test_parse_mix_rejects_unknown(self):
+        with pytest.raises(ValueError):
+            parse_mix("score=1,foo=2")
+
+    def test_summary(self):
+        results = {"score": [(i / 1000, 200) for i in range(1, 101)], "geocode": [(0.01, 200), (0.02, 503)]}
+        report = summarize(results, 2.0, {"forecast": 10, "marine": 10, "geocoding": 1})
+        assert percentile(list(range(1, 101)), 99) == 99
+        assert report["endpoints"]["score"]["p50_ms"] == 50.0
+        assert report["endpoints"]["geocode"]["errors"] == 1
+        assert report["cache"]["forecast_hit_ratio"] == 0.9
+        assert report["cache"]["marine_hit_ratio"] == 0.9
+        assert report["cache"]["ensemble_hit_ratio"] is None
+        assert report["cache"]["geocode_hit_ratio"] == 0.5
+
+    def test_hit_ratio_per_route(self):
+        results = {"score": [(0.01, 200)] * 60, "ensemble": [(0.05, 200)] * 40}
+        report = summarize(results, 1.0, {"forecast": 6, "marine": 10, "ensemble": 8})
+        # El ensemble no llama a /v1/forecast: no cuenta como acierto de esa ruta
+        assert report["cache"]["forecast_hit_ratio"] == 0.9
+        assert report["cache"]["marine_hit_ratio"] == 0.9
+        assert report["cache"]["ensemble_hit_ratio"] == 0.8
+        assert summarize({**results, "passage": [(0.1, 200)]}, 1.0, {})["cache"]["marine_hit_ratio"] is None
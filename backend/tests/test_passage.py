@@ -0,0 +1,84 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.models import PassageRequest
+from backend.scoring.batch import score_profiles
+from backend.scoring.passage import haversine_nm, route_positions, snap_to_cell, plan_passage
+from backend.services.providers import SyntheticProvider
+
+
+def make_request(**kwargs) -> PassageRequest:
+    data = {
+        "waypoints": [{"lat": 41.35, "lon": 2.17}, {"lat": 41.0, "lon": 2.5}, {"lat": 40.6, "lon": 2.6}],
+        "speed_kn": 6.0,
+        "departure": "2025-10-04T08:00",
+        "boat_type": "velero_medio",
+        "skill": "intermedio",
+        "search_hours": 12,
+        "search_step_hours": 3
+    }
+    data.update(kwargs)
+    return PassageRequest(**data)
+
+
+class TestRoute:
+    def test_haversine(self):
+        assert haversine_nm(40.0, 2.0, 41.0, 2.0) == pytest.approx(60.0, abs=0.1)
+
+    def test_positions_every_hour_until_arrival(self):
+        positions = route_positions([(40.0, 2.0), (41.0, 2.0)], 6.0)
+        assert [p[0] for p in positions[:-1]] == [float(h) for h in range(11)]
+        assert positions[-1][0] == pytest.approx(60.04 / 6.0, abs=1e-2)
+        assert positions[0][1:3] == (40.0, 2.0)
+        assert positions[-1][1] == pytest.approx(41.0, abs=1e-3)
+        assert positions[5][1] == pytest.approx(40.5, abs=1e-2)
+
+    def test_passage_too_long(self):
+        with pytest.raises(ValueError):
+            route_positions([(40.0, 2.0), (45.0, 2.0)], 1.0)
+
+    def test_departure_must_be_local(self):
+        with pytest.raises(ValueError):
+            make_request(departure="2025-10-04T08:00+02:00")
+
+    def test_snap_to_cell(self):
+        assert snap_to_cell(41.349, 2.171) == (41.3, 2.2)
+
+
+class TestPlanPassage:
+    def test_fetches_each_cell_once_and_scores_in_one_batch(self):
+        provider = SyntheticProvider()
+        loads, batches = [], []
+
+        async def load(request):
+            loads.append((request.lat, request.lon))
+            weather, marine = await asyncio.gather(
+                provider.fetch_weather(request.lat, request.lon, request.date, request.timezone, request.days),
+                provider.fetch_marine(request.lat, request.lon, request.date, request.timezone, request.days)
+            )
+            return weather, marine, 0.0
+
+        async def score(columns, profiles):
+            batches.append(len(columns["time"]))
+            return score_profiles(columns, profiles)
+
+        response = asyncio.run(plan_passage(make_request(), load, score))
+
+        assert len(loads) == len(set(loads)) == response.cells
+        assert len(batches) == 1
+        assert [d.departure for d in response.departures] == [
+            "2025-10-04T08:00", "2025-10-04T11:00", "2025-10-04T14:00", "2025-10-04T17:00", "2025-10-04T20:00"
+        ]
+        requested = response.requested
+        assert requested.complete
+        assert requested.points[0].eta == "2025-10-04T08:00"
+        assert all(point.score is not None for point in requested.points)
+        assert response.best is not None
+        assert response.best.min_score == max(
+            d.min_score for d in response.departures if d.no_go == response.best.no_go
+        )
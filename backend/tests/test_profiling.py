@@ -0,0 +1,101 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.utils.profiling import Profiler, ProfilingMiddleware, stage, _STAGES
+
+
+def busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def app(scope, receive, send):
+    with stage("fetch"):
+        await asyncio.sleep(0.02)
+    with stage("score"):
+        busy(0.03)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def call(middleware, headers=()):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/api/score", "query_string": b"lat=41", "headers": list(headers)}
+    asyncio.run(middleware(scope, None, send))
+    return sent
+
+
+class TestProfiling:
+    def test_stage_outside_request_is_noop(self):
+        with stage("score"):
+            pass
+
+    def test_slow_request_recorded_with_stages(self):
+        profiler = Profiler(sample_rate=0, slow_ms=10, token=None)
+        call(ProfilingMiddleware(app, profiler))
+        [profile] = profiler.recent()
+        assert profile["reason"] == "slow"
+        assert profile["status"] == 200
+        assert profile["stages_ms"]["fetch"] >= 15
+        assert profile["stages_ms"]["score"] >= 25
+        assert "stacks" not in profile
+
+    def test_fast_request_not_recorded(self):
+        profiler = Profiler(sample_rate=0, slow_ms=10_000, token=None)
+        call(ProfilingMiddleware(app, profiler))
+        assert profiler.recent() == []
+
+    def test_debug_header_samples_stacks(self):
+        profiler = Profiler(sample_rate=0, slow_ms=0, interval_ms=1, token="secreto")
+        middleware = ProfilingMiddleware(app, profiler)
+
+        call(middleware, [(b"x-debug-profile", b"otro")])
+        assert profiler.recent() == []
+
+        sent = call(middleware, [(b"x-debug-profile", b"secreto")])
+        [profile] = profiler.recent()
+        assert profile["reason"] == "header"
+        assert profile["samples"] > 0
+        assert any("busy" in entry["stack"] for entry in profile["stacks"])
+        headers = dict(sent[0]["headers"])
+        assert b"score;dur=" in headers[b"server-timing"]
+
+    def test_debug_header_needs_token(self):
+        profiler = Profiler(sample_rate=0, slow_ms=0, token=None)
+        sent = call(ProfilingMiddleware(app, profiler), [(b"x-debug-profile", b"1")])
+        assert profiler.recent() == []
+        assert b"server-timing" not in dict(sent[0]["headers"])
+
+    def test_ring_buffer_bounded(self):
+        profiler = Profiler(sample_rate=1.0, slow_ms=0, buffer_size=3, interval_ms=1, token=None)
+        middleware = ProfilingMiddleware(app, profiler)
+        for _ in range(5):
+            call(middleware)
+        profiles = profiler.recent()
+        assert [profile["id"] for profile in profiles] == [5, 4, 3]
+        assert profiler.recent(path="/otra") == []
+
+    def test_background_tasks_do_not_share_stages(self):
+        from backend.main import run_in_background
+
+        seen = []
+
+        async def background():
+            seen.append(_STAGES.get())
+
+        async def scenario():
+            _STAGES.set({})
+            run_in_background(background())
+            await asyncio.sleep(0)
+
+        asyncio.run(scenario())
+        assert seen == [None]
@@ -0,0 +1,43 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.providers import ReplayProvider, SyntheticProvider, RecordingProvider
+
+
+class TestProviders:
+    def test_synthetic_is_deterministic(self):
+        provider = SyntheticProvider()
+        first = asyncio.run(provider.fetch_weather(41.3, 2.1, "2025-09-30", "Europe/Madrid", 2))
+        second = asyncio.run(provider.fetch_weather(41.3, 2.1, "2025-09-30", "Europe/Madrid", 2))
+        assert first == second
+        assert len(first["hourly"]["time"]) == 48
+        assert first["hourly"]["time"][0] == "2025-09-30T00:00"
+        assert provider.stats()["calls"] == 2
+
+    def test_synthetic_marine_horizon(self):
+        marine = asyncio.run(SyntheticProvider().fetch_marine(41.3, 2.1, "2025-09-30", "UTC", 16))
+        assert len(marine["hourly"]["wave_height"]) == 8 * 24
+
+    def test_replay_redates_recording(self, tmp_path):
+        synthetic = SyntheticProvider()
+        recorder = RecordingProvider(synthetic, str(tmp_path))
+        recorded = asyncio.run(recorder.fetch_weather(41.3, 2.1, "2025-01-01", "UTC", 3))
+        assert (tmp_path / "weather_41.30_2.10.json").exists()
+
+        replay = ReplayProvider(str(tmp_path))
+        data = asyncio.run(replay.fetch_weather(41.3, 2.1, "2025-09-30", "UTC", 2))
+        assert data["hourly"]["time"][0] == "2025-09-30T00:00"
+        assert len(data["hourly"]["time"]) == 48
+        assert data["hourly"]["windspeed_10m"] == recorded["hourly"]["windspeed_10m"][:48]
+
+    def test_replay_fallback_file(self, tmp_path):
+        hourly = {"time": ["2024-01-01T00:00", "2024-01-01T01:00"], "wave_height": [0.5, 0.6]}
+        (tmp_path / "marine.json").write_text(json.dumps({"hourly": hourly}))
+        replay = ReplayProvider(str(tmp_path))
+        data = asyncio.run(replay.fetch_marine(10.0, 20.0, "2025-09-30", "UTC", 1, ["wave_height"]))
+        assert data["hourly"]["wave_height"] == [0.5, 0.6]
+        assert asyncio.run(replay.fetch_marine(10.0, 20.0, "2025-09-30", "UTC", 1)) is not None
@@ -0,0 +1,71 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.utils.serialization import dumps, to_compact, compress, MIN_COMPRESS_BYTES
+
+
+def make_payload():
+    windows = []
+    for i, hour in enumerate(["09:00", "12:00", "15:00"]):
+        windows.append({
+            "time": f"2025-09-30T{hour}",
+            "score": 50 + i * 10,
+            "label": "Bueno",
+            "reasons": ["Viento en rango óptimo"],
+            "flags": [],
+            "raw": {
+                "wind_kn": 10.0 + i,
+                "gust_kn": 14.0 + i,
+                "wave_hs_m": None if i == 0 else 0.5,
+                "wave_tp_s": 6.0,
+                "wave_dir_deg": 180.0,
+                "wind_dir_deg": 90.0,
+                "precip_mm_h": 0.0,
+                "temp_c": 21.0
+            }
+        })
+    return {
+        "location": {"name": "Lat 41.34, Lon 2.16", "lat": 41.34, "lon": 2.16, "country": None, "admin1": None},
+        "windows": windows,
+        "best_window": windows[2],
+        "safety": {"no_go": False, "why": []}
+    }
+
+
+class TestSerialization:
+    def test_dumps_roundtrip(self):
+        payload = make_payload()
+        assert json.loads(dumps(payload)) == payload
+
+    def test_compact_columns(self):
+        compact = to_compact(make_payload())
+        assert compact["best_window"] == 2
+        assert compact["raw"]["wind_kn"] == [10.0, 11.0, 12.0]
+        assert compact["raw"]["wave_hs_m"] == [None, 0.5, 0.5]
+        assert "raw" not in compact["windows"][0]
+        assert len(compact["windows"]) == 3
+
+    def test_compact_without_best_window(self):
+        payload = make_payload()
+        payload["best_window"] = None
+        assert to_compact(payload)["best_window"] is None
+
+    def test_compress_gzip(self):
+        body = b"x" * (MIN_COMPRESS_BYTES * 2)
+        compressed, encoding = compress(body, "gzip, deflate")
+        assert encoding == "gzip"
+        assert gzip.decompress(compressed) == body
+
+    def test_compress_small_body(self):
+        body, encoding = compress(b"{}", "gzip")
+        assert encoding is None
+        assert body == b"{}"
+
+    def test_compress_refused_encoding(self):
+        body = b"x" * (MIN_COMPRESS_BYTES * 2)
+        _, encoding = compress(body, "gzip;q=0, identity")
+        assert encoding is None
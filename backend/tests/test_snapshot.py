@@ -0,0 +1,74 @@
+import pickle
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.snapshot import Snapshot, pack
+from backend.services.forecast_cache import slice_hourly
+from backend.scoring.batch import extract_columns
+
+
+def make_hourly(date: str, hours: int):
+    start = datetime.fromisoformat(date)
+    return {
+        "time": [(start + timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M") for h in range(hours)],
+        "windspeed_10m": [round(5 + (h % 24) * 0.7, 1) for h in range(hours)],
+        "windgusts_10m": [round(8 + (h % 24) * 0.9, 1) for h in range(hours)],
+        "temperature_2m": [round(15.3 + (h % 7) * 0.1, 1) for h in range(hours)],
+        "precipitation": [0.0 if h % 5 else 0.2 for h in range(hours)],
+        "winddirection_10m": [None if h % 11 == 0 else float((h * 17) % 360) for h in range(hours)]
+    }
+
+
+def list_bytes(hourly) -> int:
+    """Tamaño aproximado de un bloque hourly como listas de Python"""
+    total = sys.getsizeof(hourly)
+    for values in hourly.values():
+        total += sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values if value is not None)
+    return total
+
+
+class TestSnapshot:
+    def test_roundtrip_bytes(self):
+        hourly = make_hourly("2025-09-30", 48)
+        snapshot = Snapshot.from_bytes(Snapshot.from_hourly(hourly).to_bytes())
+        assert snapshot.to_hourly() == hourly
+        assert snapshot.column("windspeed_10m").format == "f"
+
+    def test_hourly_view_matches_dict(self):
+        hourly = make_hourly("2025-09-30", 120)
+        view = Snapshot.from_hourly(hourly).hourly()
+        assert view["time"][3] == hourly["time"][3]
+        assert view["winddirection_10m"][0] is None
+        assert view["temperature_2m"][5] == hourly["temperature_2m"][5]
+        assert extract_columns(view) == extract_columns(hourly)
+
+    def test_days_window_shares_buffer(self):
+        hourly = make_hourly("2025-09-30", 24 * 5)
+        snapshot = Snapshot.from_hourly(hourly)
+        window = snapshot.days("2025-10-02", 2)
+        assert window.to_hourly() == slice_hourly(hourly, "2025-10-02", 2)
+        assert window.column("windspeed_10m").obj is snapshot.column("windspeed_10m").obj
+        assert Snapshot.from_bytes(window.to_bytes()).to_hourly() == window.to_hourly()
+
+    def test_pickle_keeps_window(self):
+        hourly = make_hourly("2025-09-30", 24 * 3)
+        view = Snapshot.from_hourly(hourly).days("2025-10-01", 1).hourly()
+        copy = pickle.loads(pickle.dumps(view))
+        assert copy.snapshot.to_hourly() == slice_hourly(hourly, "2025-10-01", 1)
+
+    def test_irregular_series_not_packed(self):
+        hourly = make_hourly("2025-09-30", 4)
+        hourly["time"][2] = "2025-09-30T05:00"
+        with pytest.raises(ValueError):
+            Snapshot.from_hourly(hourly)
+        data = {"hourly": hourly}
+        assert pack(data) is data
+
+    def test_memory_reduction(self):
+        hourly = make_hourly("2025-09-30", 24 * 16)
+        assert list_bytes(hourly) >= 5 * len(Snapshot.from_hourly(hourly).to_bytes())
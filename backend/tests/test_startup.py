@@ -0,0 +1,32 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.tools.startup_bench import import_profile, parse_importtime
+
+
+# Presupuesto del tiempo propio de los módulos backend.* al importar la app (FastAPI aparte)
+IMPORT_BUDGET_MS = float(os.environ.get("STARTUP_IMPORT_BUDGET_MS", "250"))
+
+# Módulos que solo deben cargarse cuando se usan
+LAZY_MODULES = ("httpx", "concurrent.futures.process", "brotli", "pyarrow", "backend.backtest")
+
+
+class TestStartup:
+    def test_parse_importtime(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        300 |   backend.models\n"
+            "import time:      1500 |       2000 | backend.main\n"
+        )
+        assert parse_importtime(stderr) == {"backend.models": (120, 300), "backend.main": (1500, 2000)}
+
+    def test_import_budget(self):
+        modules = import_profile("backend.main")
+        assert "backend.main" in modules
+        for name in LAZY_MODULES:
+            assert name not in modules, f"{name} se importa al arrancar"
+        own_ms = sum(self_us for name, (self_us, _) in modules.items() if name.split(".")[0] == "backend") / 1000
+        assert own_ms < IMPORT_BUDGET_MS, f"backend.* tarda {own_ms:.1f} ms en importarse"
@@ -0,0 +1,326 @@
+"""
+Prueba de carga de la API contra un Open-Meteo simulado (backend.tools.mock_upstream).
+
+Arranca el servidor simulado y la API (uvicorn) apuntando a él, lanza tráfico con
+ubicaciones repartidas según una Zipf y una mezcla de perfiles barco/nivel, e informa
+de throughput, percentiles de latencia, llamadas a Open-Meteo y eficiencia del cache.
+
+Ejemplos:
+    python -m backend.tools.loadtest --duration 30 --concurrency 32 --locations 500
+    python -m backend.tools.loadtest --mix "score=0.5,daily=0.2,geocode=0.2,ensemble=0.1" --json run.json
+
+Con --url se ataca una API ya arrancada, que debe usar las OPENMETEO_*_URL que imprime el script.
+"""
+from backend.models import BoatType, SkillLevel
+from backend.tools.mock_upstream import MockUpstream
+from typing import Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+DEFAULT_MIX = "score=0.6,score_get=0.1,daily=0.15,geocode=0.15"
+
+# Reparto aproximado de perfiles entre los usuarios
+BOAT_WEIGHTS = {
+    BoatType.DINGHY: 0.2,
+    BoatType.CATAMARAN_LIGERO: 0.1,
+    BoatType.VELERO_PEQUENO: 0.2,
+    BoatType.VELERO_MEDIO: 0.3,
+    BoatType.VELERO_GRANDE: 0.1,
+    BoatType.TABLAS: 0.1,
+}
+SKILL_WEIGHTS = {SkillLevel.PRINCIPIANTE: 0.3, SkillLevel.INTERMEDIO: 0.5, SkillLevel.AVANZADO: 0.2}
+
+PLACES = (
+    "Barcelona", "Palma", "Valencia", "Cádiz", "Málaga", "Alicante", "Santander", "A Coruña",
+    "Ibiza", "Mahón", "Tarragona", "Almería", "Vigo", "Bilbao", "Cartagena", "Denia"
+)
+
+# Peticiones que usan cada ruta de Open-Meteo; sirven para estimar el acierto del cache por ruta.
+# El ensemble pide sus miembros a /v1/ensemble (un modelo por defecto) y solo el mar a /v1/marine
+ROUTE_KINDS = {
+    "forecast": ("score", "score_get", "daily"),
+    "marine": ("score", "score_get", "daily", "ensemble"),
+    "ensemble": ("ensemble",),
+}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in REQUEST_BUILDERS:
+            raise ValueError(f"Tipo de petición desconocido: {kind}")
+        mix[kind.strip()] = float(weight or 1)
+    return mix
+
+
+class ZipfSampler:
+    """Elige índices 0..n-1 con probabilidad proporcional a 1 / (rango ^ s)"""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1 / (rank ** s) for rank in range(1, n + 1)))
+
+    def sample(self) -> int:
+        return bisect.bisect_left(self.cumulative, self.rng.random() * self.cumulative[-1])
+
+
+def make_locations(n: int, seed: int) -> List[Tuple[float, float]]:
+    """Spots en el litoral peninsular y Baleares (caja aproximada)"""
+    rng = random.Random(seed)
+    return [(round(rng.uniform(36.0, 43.5), 3), round(rng.uniform(-9.0, 4.3), 3)) for _ in range(n)]
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Percentil por rango más cercano sobre valores ya ordenados"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+class TrafficModel:
+    """Genera peticiones: ubicación Zipf, perfil según los pesos y tipo según la mezcla"""
+
+    def __init__(self, locations: List[Tuple[float, float]], zipf_s: float, mix: Dict[str, float], seed: int):
+        self.rng = random.Random(seed)
+        self.locations = locations
+        self.location_sampler = ZipfSampler(len(locations), zipf_s, self.rng)
+        self.place_sampler = ZipfSampler(len(PLACES), zipf_s, self.rng)
+        self.kinds = list(mix)
+        self.kind_weights = list(mix.values())
+        self.date = datetime.now().strftime("%Y-%m-%d")
+
+    def profile(self) -> Tuple[str, str]:
+        boat = self.rng.choices(list(BOAT_WEIGHTS), weights=list(BOAT_WEIGHTS.values()))[0]
+        skill = self.rng.choices(list(SKILL_WEIGHTS), weights=list(SKILL_WEIGHTS.values()))[0]
+        return boat.value, skill.value
+
+    def next(self) -> Tuple[str, str, str, Optional[Dict], Optional[Dict]]:
+        """(tipo, método, ruta, query, cuerpo JSON)"""
+        kind = self.rng.choices(self.kinds, weights=self.kind_weights)[0]
+        return (kind, *REQUEST_BUILDERS[kind](self))
+
+
+def _score_body(traffic: TrafficModel) -> Dict:
+    lat, lon = traffic.locations[traffic.location_sampler.sample()]
+    boat_type, skill = traffic.profile()
+    return {"lat": lat, "lon": lon, "boat_type": boat_type, "skill": skill, "date": traffic.date}
+
+
+def _passage_body(traffic: TrafficModel) -> Dict:
+    body = _score_body(traffic)
+    lat, lon = body.pop("lat"), body.pop("lon")
+    body.pop("date")
+    return {
+        **body,
+        "waypoints": [{"lat": lat, "lon": lon}, {"lat": lat - 0.3, "lon": lon + 0.3}],
+        "speed_kn": 6.0,
+        "departure": f"{traffic.date}T09:00",
+        "search_hours": 12
+    }
+
+
+REQUEST_BUILDERS = {
+    "score": lambda t: ("POST", "/api/score", None, _score_body(t)),
+    "score_get": lambda t: ("GET", "/api/score", _score_body(t), None),
+    "daily": lambda t: ("POST", "/api/score/daily", None, _score_body(t)),
+    "geocode": lambda t: ("GET", "/api/geocode", {"q": PLACES[t.place_sampler.sample()]}, None),
+    "ensemble": lambda t: ("POST", "/api/score/ensemble", None, _score_body(t)),
+    "passage": lambda t: ("POST", "/api/passage", None, _passage_body(t)),
+}
+
+
+async def drive(base_url: str, traffic: TrafficModel, duration: float, concurrency: int) -> Tuple[Dict[str, List], float]:
+    """Lanza peticiones con `concurrency` clientes durante `duration` segundos"""
+    import httpx
+
+    results: Dict[str, List[Tuple[float, int]]] = {}
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        async def worker():
+            while time.perf_counter() < deadline:
+                kind, method, path, params, body = traffic.next()
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, params=params, json=body)
+                    status = response.status_code
+                except httpx.HTTPError:
+                    status = 0
+                results.setdefault(kind, []).append((time.perf_counter() - start, status))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return results, time.perf_counter() - started
+
+
+def summarize(results: Dict[str, List[Tuple[float, int]]], elapsed: float, upstream: Dict[str, int]) -> Dict:
+    """Throughput, percentiles por tipo de petición, llamadas a Open-Meteo y acierto estimado del cache"""
+    endpoints = {}
+    for kind, samples in sorted(results.items()):
+        latencies = sorted(latency * 1000 for latency, _ in samples)
+        endpoints[kind] = {
+            "requests": len(samples),
+            "errors": sum(1 for _, status in samples if status == 0 or status >= 400),
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p90_ms": round(percentile(latencies, 90), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+            "max_ms": round(latencies[-1], 1) if latencies else 0.0
+        }
+
+    total = sum(len(samples) for samples in results.values())
+    geocode_requests = len(results.get("geocode", []))
+    cache = {}
+    for route, kinds in ROUTE_KINDS.items():
+        requests = sum(len(results.get(kind, [])) for kind in kinds)
+        # Una travesía descarga varias celdas, así que con "passage" en la mezcla el acierto no es estimable
+        estimable = requests and "passage" not in results
+        cache[f"{route}_hit_ratio"] = round(1 - upstream.get(route, 0) / requests, 3) if estimable else None
+    cache.update({
+        "geocode_hit_ratio": round(1 - upstream.get("geocoding", 0) / geocode_requests, 3) if geocode_requests else None,
+        "upstream_calls_per_request": round(
+            sum(count for name, count in upstream.items() if name != "errors") / total, 3
+        ) if total else 0.0
+    })
+    return {
+        "duration_s": round(elapsed, 1),
+        "requests": total,
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "endpoints": endpoints,
+        "upstream": upstream,
+        "cache": cache
+    }
+
+
+def print_report(report: Dict) -> None:
+    print(f"\n{report['requests']} peticiones en {report['duration_s']} s ({report['rps']} req/s)\n")
+    print(f"{'endpoint':<10} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for kind, row in report["endpoints"].items():
+        print(
+            f"{kind:<10} {row['requests']:>7} {row['errors']:>5} {row['rps']:>8} "
+            f"{row['p50_ms']:>8} {row['p90_ms']:>8} {row['p99_ms']:>8} {row['max_ms']:>8}"
+        )
+    print(f"\nLlamadas a Open-Meteo: {report['upstream']}")
+    if report.get("provider"):
+        print(f"Proveedor de forecast: {report['provider']}")
+    print(f"Cache: {report['cache']}")
+
+
+def provider_stats(base_url: str) -> Optional[Dict]:
+    """Estadísticas del proveedor de forecast que publica /api/health (de un solo worker)"""
+    import httpx
+
+    try:
+        return httpx.get(f"{base_url}/api/health", timeout=5.0).json().get("provider")
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_api(port: int, workers: int, env: Dict[str, str], provider: str = "openmeteo") -> subprocess.Popen:
+    """Arranca la API con uvicorn y espera a que responda /api/health"""
+    import httpx
+
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning"
+        ],
+        cwd=ROOT, env={**os.environ, **env, "FORECAST_PROVIDER": provider}
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("La API ha terminado al arrancar")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/health", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("La API no ha respondido en 60 s")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backend.tools.loadtest", description="Prueba de carga de la API")
+    parser.add_argument("--url", help="API ya arrancada (por defecto se arranca una con uvicorn)")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn")
+    parser.add_argument("--duration", type=float, default=20.0, help="Segundos de carga")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clientes simultáneos")
+    parser.add_argument("--locations", type=int, default=200, help="Spots distintos")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Exponente de la Zipf de ubicaciones")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Mezcla de peticiones tipo=peso,...")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mock-port", type=int, default=0, help="Puerto del Open-Meteo simulado")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="Latencia simulada de Open-Meteo")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Variación de la latencia simulada")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de errores de Open-Meteo")
+    parser.add_argument("--extra-variables", type=int, default=0, help="Columnas de relleno en las respuestas")
+    parser.add_argument(
+        "--provider", default="openmeteo", choices=("openmeteo", "replay", "synthetic"),
+        help="FORECAST_PROVIDER de la API arrancada (openmeteo usa el servidor simulado)"
+    )
+    parser.add_argument("--json", help="Guarda el informe en este fichero")
+    args = parser.parse_args()
+
+    mock = MockUpstream(
+        port=args.mock_port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, extra_variables=args.extra_variables, seed=args.seed
+    ).start()
+    api = None
+    try:
+        if args.url:
+            base_url = args.url
+            print("Open-Meteo simulado; la API debe arrancarse con:")
+            for name, value in mock.env().items():
+                print(f"  {name}={value}")
+        else:
+            port = free_port()
+            api = start_api(port, args.workers, mock.env(), args.provider)
+            base_url = f"http://127.0.0.1:{port}"
+
+        traffic = TrafficModel(make_locations(args.locations, args.seed), args.zipf_s, parse_mix(args.mix), args.seed)
+        mock.reset()
+        results, elapsed = asyncio.run(drive(base_url, traffic, args.duration, args.concurrency))
+        report = summarize(results, elapsed, mock.stats())
+        report["provider"] = provider_stats(base_url)
+        if args.provider != "openmeteo":
+            # El forecast no pasa por el servidor simulado: sus llamadas no miden el cache
+            for route in ROUTE_KINDS:
+                report["cache"][f"{route}_hit_ratio"] = None
+        report["config"] = {key: value for key, value in vars(args).items() if key != "json"}
+        print_report(report)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+    finally:
+        if api is not None:
+            api.terminate()
+            api.wait(timeout=30)
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Servidor local que imita las APIs de Open-Meteo (forecast, marine, geocoding y ensemble)
+para pruebas de carga sin red. Los datos salen de SyntheticProvider; la latencia, la tasa
+de errores y el tamaño de las respuestas son configurables, y cuenta las llamadas recibidas.
+
+Ejemplo:
+    python -m backend.tools.mock_upstream --port 8099 --latency-ms 80 --error-rate 0.01
+
+y en el proceso de la API:
+    OPENMETEO_FORECAST_URL=http://127.0.0.1:8099/v1/forecast
+    OPENMETEO_MARINE_URL=http://127.0.0.1:8099/v1/marine
+    OPENMETEO_GEOCODING_URL=http://127.0.0.1:8099/v1/search
+    OPENMETEO_ENSEMBLE_URL=http://127.0.0.1:8099/v1/ensemble
+"""
+from backend.services.providers import SyntheticProvider
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+from datetime import datetime
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+
+# Ruta -> nombre de la API en las estadísticas
+ROUTES = {
+    "/v1/forecast": "forecast",
+    "/v1/marine": "marine",
+    "/v1/search": "geocoding",
+    "/v1/ensemble": "ensemble",
+}
+
+
+class MockUpstream:
+    """Servidor HTTP en un hilo aparte con los endpoints de Open-Meteo que usa el backend"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        extra_variables: int = 0,
+        members: int = 20,
+        seed: int = 0
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.extra_variables = extra_variables
+        self.provider = SyntheticProvider(seed=seed, members=members)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Variables de entorno que apuntan los servicios del backend a este servidor"""
+        return {
+            "OPENMETEO_FORECAST_URL": f"{self.url}/v1/forecast",
+            "OPENMETEO_MARINE_URL": f"{self.url}/v1/marine",
+            "OPENMETEO_GEOCODING_URL": f"{self.url}/v1/search",
+            "OPENMETEO_ENSEMBLE_URL": f"{self.url}/v1/ensemble",
+        }
+
+    def start(self) -> "MockUpstream":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def _delay(self) -> float:
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def respond(self, path: str, params: Dict[str, str]) -> Dict:
+        """Cuerpo de la respuesta para una ruta de Open-Meteo"""
+        if path == "/v1/search":
+            name = params.get("name", "")
+            rng = random.Random(name.lower())
+            return {"results": [
+                {
+                    "name": f"{name.title()} {i + 1}" if i else name.title(),
+                    "latitude": round(rng.uniform(36.0, 43.5), 4),
+                    "longitude": round(rng.uniform(-9.0, 3.5), 4),
+                    "country": "España",
+                    "admin1": "Mock"
+                }
+                for i in range(min(int(params.get("count", 5)), 5))
+            ]}
+
+        lat = float(params["latitude"])
+        lon = float(params["longitude"])
+        date = params["start_date"]
+        days = (datetime.fromisoformat(params["end_date"]) - datetime.fromisoformat(date)).days + 1
+        timezone = params.get("timezone", "UTC")
+        variables = [name for name in params.get("hourly", "").split(",") if name]
+
+        if path == "/v1/forecast":
+            data = asyncio.run(self.provider.fetch_weather(lat, lon, date, timezone, days, variables))
+        elif path == "/v1/marine":
+            data = asyncio.run(self.provider.fetch_marine(lat, lon, date, timezone, days, variables))
+        else:
+            data = asyncio.run(self.provider.fetch_ensemble(
+                lat, lon, date, timezone, days, params.get("models", "icon_seamless"), variables
+            ))
+
+        # Columnas de relleno para simular respuestas más grandes
+        hours = len(data["hourly"]["time"])
+        for i in range(self.extra_variables):
+            data["hourly"][f"padding_{i:02d}"] = [round(h * 0.1 + i, 1) for h in range(hours)]
+        return data
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path == "/stats":
+                    return self._send(200, mock.stats())
+                name = ROUTES.get(parsed.path)
+                if name is None:
+                    return self._send(404, {"error": True, "reason": "Not found"})
+
+                mock._count(name)
+                time.sleep(mock._delay())
+                if mock._should_fail():
+                    mock._count("errors")
+                    return self._send(503, {"error": True, "reason": "Error simulado"})
+
+                params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                try:
+                    body = mock.respond(parsed.path, params)
+                except (KeyError, ValueError) as e:
+                    return self._send(400, {"error": True, "reason": f"Parámetro no válido: {e}"})
+                self._send(200, body)
+
+            def _send(self, status: int, body: Dict) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backend.tools.mock_upstream", description="Open-Meteo simulado")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latencia de cada respuesta")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Variación aleatoria de la latencia (±)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de respuestas 503")
+    parser.add_argument("--extra-variables", type=int, default=0, help="Columnas de relleno por respuesta")
+    args = parser.parse_args()
+
+    mock = MockUpstream(
+        args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.extra_variables
+    ).start()
+    print(f"Open-Meteo simulado en {mock.url} (estadísticas en {mock.url}/stats)")
+    for name, value in mock.env().items():
+        print(f"  {name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark de arranque en frío del proceso de la API.
+
+Mide, en procesos nuevos, el tiempo de importar `backend.main` y el de dejar la app
+lista (lifespan completo, incluido el pool de scoring), y lista los módulos más caros
+según `python -X importtime`.
+
+Ejemplo:
+    python -m backend.tools.startup_bench --runs 10 --top 15
+"""
+from typing import Dict, List, Tuple
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Se ejecuta en un proceso nuevo; imprime los tiempos en segundos como JSON
+_PROBE = """
+import asyncio, json, time
+t0 = time.perf_counter()
+import backend.main as main
+t1 = time.perf_counter()
+
+async def ready():
+    async with main.lifespan(main.app):
+        return time.perf_counter()
+
+t2 = asyncio.run(ready())
+print(json.dumps({"import": t1 - t0, "ready": t2 - t0}))
+"""
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Módulo -> (tiempo propio, tiempo acumulado) en microsegundos a partir de la salida de -X importtime"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        modules[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return modules
+
+
+def import_profile(module: str = "backend.main") -> Dict[str, Tuple[int, int]]:
+    """Importa `module` en un proceso nuevo con -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def measure(runs: int) -> List[Dict[str, float]]:
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", _PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backend.tools.startup_bench", description="Arranque en frío de la API")
+    parser.add_argument("--runs", type=int, default=5, help="Procesos a medir")
+    parser.add_argument("--top", type=int, default=10, help="Módulos más caros a listar")
+    args = parser.parse_args()
+
+    samples = measure(args.runs)
+    for stage in ("import", "ready"):
+        values = [sample[stage] * 1000 for sample in samples]
+        print(f"{stage:>6}: mediana {statistics.median(values):7.1f} ms   p90 {_percentile(values, 0.9):7.1f} ms")
+
+    modules = import_profile()
+    own = sum(self_us for name, (self_us, _) in modules.items() if name.split(".")[0] == "backend")
+    print(f"\nTiempo propio de los módulos backend.*: {own / 1000:.1f} ms")
+    print("Módulos más caros (acumulado, ms):")
+    for name, (self_us, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
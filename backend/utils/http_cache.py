@@ -0,0 +1,36 @@
+from typing import Dict, Optional
+import hashlib
+
+
+def make_etag(*parts) -> str:
+    """ETag fuerte derivado de las partes que determinan el cuerpo de la respuesta"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comprueba If-None-Match contra el ETag (comparación débil, como indica RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cache_headers(etag: str, fetched_at: float, ttl: float, now: float) -> Dict[str, str]:
+    """
+    Cabeceras ETag, Cache-Control y Age coherentes con el TTL del cache del servidor.
+    max-age es la vida total de la respuesta: los caches descuentan Age por su cuenta (RFC 9111).
+    """
+    age = min(max(0, int(now - fetched_at)), int(ttl))
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={int(ttl)}",
+        "Age": str(age)
+    }
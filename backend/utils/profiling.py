@@ -0,0 +1,227 @@
+"""
+Perfilado por petición para diagnosticar latencias de cola en producción.
+
+- Cada petición HTTP mide cuánto tiempo pasa en cada etapa (fetch, sample, score, serialize).
+- Las peticiones más lentas que PROFILE_SLOW_MS se guardan con ese desglose.
+- Una fracción PROFILE_SAMPLE_RATE de peticiones, y las que llevan la cabecera de depuración,
+  se perfilan además con un muestreador de pilas (sys._current_frames) en un hilo aparte.
+
+Los perfiles van a un buffer circular en memoria que sirve /api/admin/profiles.
+"""
+from typing import Counter as CounterType, Deque, Dict, Iterator, List, Optional, Tuple
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+
+
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", "1000"))
+PROFILE_BUFFER_SIZE = int(os.environ.get("PROFILE_BUFFER_SIZE", "200"))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+PROFILE_HEADER = "x-debug-profile"
+
+# Sin token no hay perfilado por cabecera ni endpoint de administración; con token, la cabecera
+# de depuración debe llevarlo
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# Profundidad máxima de las pilas muestreadas y pilas distintas guardadas por perfil
+MAX_STACK_DEPTH = 48
+MAX_STACKS = 50
+
+# Segundos acumulados por etapa de la petición en curso; None fuera de una petición
+_STAGES: ContextVar[Optional[Dict[str, float]]] = ContextVar("profiling_stages", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Acumula el tiempo del bloque en la etapa `name` de la petición en curso"""
+    stages = _STAGES.get()
+    if stages is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - start
+
+
+def _folded(frame) -> str:
+    """Pila en formato "plegado" (de fuera a dentro, separada por ;) compatible con flamegraph.pl"""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """
+    Muestrea la pila de los hilos con peticiones perfiladas cada `interval` segundos.
+    El hilo solo trabaja mientras hay alguna petición perfilada en curso; como el event loop
+    es compartido, las muestras de una petición incluyen lo que hagan a la vez las demás.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._active: Dict[int, Tuple[int, CounterType[str]]] = {}
+        self._tokens = itertools.count()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self, thread_id: int) -> int:
+        token = next(self._tokens)
+        with self._lock:
+            self._active[token] = (thread_id, Counter())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return token
+
+    def end(self, token: int) -> CounterType[str]:
+        with self._lock:
+            _, counts = self._active.pop(token)
+        return counts
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._wakeup.clear()
+            self._wakeup.wait()
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, counts in self._active.values():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        counts[_folded(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+class Profiler:
+    """Decide qué peticiones se perfilan y guarda los perfiles en un buffer circular"""
+
+    def __init__(
+        self,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        slow_ms: float = PROFILE_SLOW_MS,
+        buffer_size: int = PROFILE_BUFFER_SIZE,
+        interval_ms: float = PROFILE_INTERVAL_MS,
+        token: Optional[str] = ADMIN_TOKEN
+    ):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.token = token
+        self.sampler = StackSampler(interval_ms / 1000)
+        self.profiles: Deque[Dict] = deque(maxlen=buffer_size)
+        self._ids = itertools.count(1)
+
+    def reason(self, debug_header: Optional[str]) -> Optional[str]:
+        """Motivo para perfilar la pila de esta petición, o None"""
+        if debug_header is not None and self.token and debug_header == self.token:
+            return "header"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def record(
+        self,
+        scope: Dict,
+        status: int,
+        duration: float,
+        stages: Dict[str, float],
+        reason: Optional[str],
+        stacks: Optional[CounterType[str]]
+    ) -> Optional[Dict]:
+        """Guarda el perfil si la petición fue perfilada o superó el umbral de lentitud"""
+        duration_ms = duration * 1000
+        if reason is None:
+            if self.slow_ms <= 0 or duration_ms < self.slow_ms:
+                return None
+            reason = "slow"
+
+        profile = {
+            "id": next(self._ids),
+            "reason": reason,
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status": status,
+            "started_at": round(time.time() - duration, 3),
+            "duration_ms": round(duration_ms, 2),
+            "stages_ms": {name: round(seconds * 1000, 2) for name, seconds in stages.items()}
+        }
+        profile["stages_ms"]["other"] = round(max(0.0, duration_ms - sum(stages.values()) * 1000), 2)
+        if stacks is not None:
+            profile["samples"] = sum(stacks.values())
+            profile["stacks"] = [{"stack": stack, "count": count} for stack, count in stacks.most_common(MAX_STACKS)]
+        self.profiles.append(profile)
+        return profile
+
+    def recent(self, limit: int = 50, path: Optional[str] = None, reason: Optional[str] = None) -> List[Dict]:
+        """Perfiles más recientes primero, filtrados por ruta y motivo"""
+        selected = [
+            profile for profile in reversed(self.profiles)
+            if (path is None or profile["path"] == path) and (reason is None or profile["reason"] == reason)
+        ]
+        return selected[:limit]
+
+
+def server_timing(stages: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in stages.items())
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que mide las etapas de cada petición HTTP y pasa el resultado al Profiler.
+    Las peticiones con la cabecera de depuración reciben además el desglose en Server-Timing.
+    """
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        debug_header = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode():
+                debug_header = value.decode("latin-1")
+                break
+        reason = self.profiler.reason(debug_header)
+
+        stages: Dict[str, float] = {}
+        status = 500
+        context = _STAGES.set(stages)
+        token = self.profiler.sampler.begin(threading.get_ident()) if reason else None
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if reason == "header":
+                    message["headers"] = [
+                        *message.get("headers", []), (b"server-timing", server_timing(stages).encode())
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            duration = time.perf_counter() - start
+            stacks = self.profiler.sampler.end(token) if token is not None else None
+            _STAGES.reset(context)
+            self.profiler.record(scope, status, duration, stages, reason, stacks)
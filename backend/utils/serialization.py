@@ -0,0 +1,118 @@
+import gzip
+import importlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Dependencias opcionales (orjson, brotli): se importan la primera vez que se usan
+_OPTIONAL: Dict[str, Any] = {}
+
+
+# Por debajo de este tamaño la compresión no compensa el coste de CPU
+MIN_COMPRESS_BYTES = 1024
+
+RAW_COLUMNS = (
+    "wind_kn", "gust_kn", "wave_hs_m", "wave_tp_s",
+    "wave_dir_deg", "wind_dir_deg", "precip_mm_h", "temp_c"
+)
+
+
+def optional_module(name: str):
+    """Importa una dependencia opcional bajo demanda; None si no está instalada"""
+    try:
+        return _OPTIONAL[name]
+    except KeyError:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            module = None
+        _OPTIONAL[name] = module
+        return module
+
+
+def dumps(data: Any) -> bytes:
+    """Serializa a JSON usando orjson si está disponible"""
+    orjson = optional_module("orjson")
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def to_compact(payload: Dict) -> Dict:
+    """
+    Convierte un ScoreResponse (ya en dict) a la forma compacta:
+    las métricas `raw` se envían como columnas y `best_window` como índice.
+    """
+    windows = payload["windows"]
+    raw_columns: Dict[str, List[Any]] = {name: [] for name in RAW_COLUMNS}
+    compact_windows = []
+    best_index = None
+    best = payload.get("best_window")
+
+    for i, window in enumerate(windows):
+        raw = window["raw"]
+        for name in RAW_COLUMNS:
+            raw_columns[name].append(raw.get(name))
+        compact_windows.append({
+            "time": window["time"],
+            "score": window["score"],
+            "label": window["label"],
+            "reasons": window["reasons"],
+            "flags": window["flags"]
+        })
+        if best_index is None and best is not None and window["time"] == best["time"]:
+            best_index = i
+
+    return {
+        "location": payload["location"],
+        "windows": compact_windows,
+        "raw": raw_columns,
+        "best_window": best_index,
+        "safety": payload["safety"]
+    }
+
+
+def _accepted_encodings(accept_encoding: Optional[str]) -> List[str]:
+    """Devuelve las codificaciones aceptadas (q > 0) de la cabecera Accept-Encoding"""
+    if not accept_encoding:
+        return []
+    accepted = []
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if token:
+            accepted.append(token)
+    return accepted
+
+
+def preferred_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Codificación que se usará para el cliente: br, gzip o None"""
+    accepted = _accepted_encodings(accept_encoding)
+    if "br" in accepted and optional_module("brotli") is not None:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """
+    Comprime el cuerpo con brotli o gzip según lo que acepte el cliente.
+    Retorna (cuerpo, content-encoding o None si no se comprime)
+    """
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+
+    encoding = preferred_encoding(accept_encoding)
+    if encoding == "br":
+        return optional_module("brotli").compress(body, quality=4), "br"
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=5, mtime=0), "gzip"
+    return body, None